@@ -0,0 +1,44 @@
+"""Store interview config as JSONB and add a version counter
+
+Revision ID: 4b7e1c9a2f30
+Revises: da82a63989d2
+Create Date: 2026-10-17 10:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e1c9a2f30'
+down_revision: Union[str, None] = 'da82a63989d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        'interviews', 'config',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=True,
+        postgresql_using='config::jsonb',
+    )
+    op.add_column(
+        'interviews',
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('interviews', 'version')
+    op.alter_column(
+        'interviews', 'config',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using='config::json',
+    )
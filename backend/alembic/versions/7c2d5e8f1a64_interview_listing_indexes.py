@@ -0,0 +1,36 @@
+"""Add keyset pagination indexes for interview listings
+
+Revision ID: 7c2d5e8f1a64
+Revises: 4b7e1c9a2f30
+Create Date: 2026-10-17 11:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d5e8f1a64'
+down_revision: Union[str, None] = '4b7e1c9a2f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_interviews_user_status_started_at',
+        'interviews',
+        ['user_id', 'status', sa.text('started_at DESC'), sa.text('id DESC')],
+    )
+    op.create_index(
+        'ix_interviews_user_started_at',
+        'interviews',
+        ['user_id', sa.text('started_at DESC'), sa.text('id DESC')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interviews_user_started_at', table_name='interviews')
+    op.drop_index('ix_interviews_user_status_started_at', table_name='interviews')
@@ -0,0 +1,35 @@
+"""Index interview messages for transcript range scans
+
+Revision ID: 9a41d7e3c2b5
+Revises: 7c2d5e8f1a64
+Create Date: 2026-10-17 11:48:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a41d7e3c2b5'
+down_revision: Union[str, None] = '7c2d5e8f1a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_interview_messages_interview_id_id',
+        'interview_messages',
+        ['interview_id', 'id'],
+    )
+    op.create_index(
+        'ix_interview_messages_interview_id_timestamp',
+        'interview_messages',
+        ['interview_id', 'timestamp'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interview_messages_interview_id_timestamp', table_name='interview_messages')
+    op.drop_index('ix_interview_messages_interview_id_id', table_name='interview_messages')
@@ -0,0 +1,42 @@
+"""Add delta-compressed code snapshot history
+
+Revision ID: b5e2f7a1c9d3
+Revises: 9a41d7e3c2b5
+Create Date: 2026-10-17 15:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e2f7a1c9d3'
+down_revision: Union[str, None] = '9a41d7e3c2b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'code_snapshots',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('interview_id', sa.Integer(), nullable=False),
+        sa.Column('revision', sa.Integer(), nullable=False),
+        sa.Column('is_keyframe', sa.Boolean(), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.Column('code_size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        'ix_code_snapshots_interview_id_revision',
+        'code_snapshots',
+        ['interview_id', 'revision'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_code_snapshots_interview_id_revision', table_name='code_snapshots')
+    op.drop_table('code_snapshots')
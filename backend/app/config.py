@@ -1,12 +1,26 @@
 """Application settings and dependency helpers."""
 
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Optional
 
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
+class SandboxLimitProfile(BaseModel):
+    """Per-run resource caps applied to candidate code."""
+
+    memory_mb: int = Field(512, ge=16, description="Address space budget per run")
+    cpu_seconds: int = Field(5, ge=1, description="CPU time budget per run")
+    max_file_mb: int = Field(16, ge=1, description="Largest file a run may write")
+    max_processes: int = Field(
+        32,
+        ge=1,
+        description="Most processes a run may have alive at once; the worker counts "
+        "the run's descendants and kills them all when the count goes over",
+    )
+
+
 class Settings(BaseSettings):
     """Runtime configuration loaded from env vars or .env file."""
 
@@ -21,6 +35,11 @@ class Settings(BaseSettings):
     postgres_db: str = Field("mockloop_dev", description="PostgreSQL database name")
     postgres_user: str = Field("mockloop", description="PostgreSQL username")
     postgres_password: str = Field("dev_password", description="PostgreSQL password")
+    database_url_override: Optional[str] = Field(
+        None,
+        description="Full async SQLAlchemy URL used instead of the postgres_* settings, "
+        "e.g. sqlite+aiosqlite:///bench.db for benchmarks",
+    )
 
     # Redis settings
     redis_host: str = Field("localhost", description="Redis host")
@@ -40,11 +59,179 @@ class Settings(BaseSettings):
         description="Placeholder model identifier used by the mock AI service.",
     )
     openai_api_key: str = Field("", description="OpenAI API key")
+    llm_provider: str = Field(
+        "mock",
+        description='Interviewer replies from "mock" (scripted) or "openai" (any compatible API)',
+    )
+    llm_base_url: str = Field(
+        "https://api.openai.com/v1",
+        description="OpenAI-compatible API root; point at app.services.fake_llm to run offline",
+    )
+    llm_timeout_seconds: float = Field(
+        30.0, gt=0, description="Read timeout between streamed chunks"
+    )
+    llm_connect_timeout_seconds: float = Field(5.0, gt=0, description="Connection setup timeout")
+    llm_first_token_timeout_seconds: float = Field(
+        10.0, gt=0, description="Retry an attempt that has not produced a token by then"
+    )
+    llm_max_retries: int = Field(
+        2, ge=0, description="Retries before the first token is streamed"
+    )
+    llm_max_concurrency: int = Field(
+        16, ge=1, description="Concurrent upstream LLM calls per process"
+    )
+    llm_http2: bool = Field(True, description="Use HTTP/2 to the LLM API when h2 is installed")
+    llm_cache_max_entries: int = Field(
+        1024,
+        ge=0,
+        description="Interviewer replies kept for identical requests (0 disables caching)",
+    )
+    llm_cache_ttl_seconds: float = Field(
+        600.0, gt=0, description="How long a cached interviewer reply may be replayed"
+    )
+
+    # Code runner settings
+    sandbox_pool_size: int = Field(
+        4, ge=1, description="Number of pre-spawned Python workers kept warm"
+    )
+    sandbox_max_runs_per_worker: int = Field(
+        50, ge=1, description="Recycle a worker after this many executions"
+    )
+    sandbox_timeout_seconds: float = Field(
+        10.0, gt=0, description="Wall-clock limit for a single code execution"
+    )
+    sandbox_max_output_bytes: int = Field(
+        1_000_000, ge=1024, description="Captured stdout/stderr cap per execution"
+    )
+    sandbox_max_queue: int = Field(
+        32, ge=0, description="Runs allowed to wait for a free worker before rejecting"
+    )
+    sandbox_queue_timeout_seconds: float = Field(
+        5.0, gt=0, description="Longest a run may wait for a free worker"
+    )
+    sandbox_scratch_dir: Optional[str] = Field(
+        None, description="Parent directory for worker scratch space (defaults to /dev/shm)"
+    )
+    sandbox_limit_profiles: Dict[str, SandboxLimitProfile] = Field(
+        default_factory=lambda: {
+            "easy": SandboxLimitProfile(memory_mb=256, cpu_seconds=3),
+            "medium": SandboxLimitProfile(memory_mb=512, cpu_seconds=5),
+            "hard": SandboxLimitProfile(memory_mb=1024, cpu_seconds=8),
+        },
+        description="Resource limits keyed by interview difficulty",
+    )
+    sandbox_default_limit_profile: str = Field(
+        "medium", description="Profile used when a run names no known difficulty"
+    )
+    sandbox_isolate_network: bool = Field(
+        True, description="Run workers in an empty network namespace where the kernel allows"
+    )
+    code_cache_max_entries: int = Field(
+        2048, ge=0, description="Entries kept in the in-process execution cache"
+    )
+    code_cache_max_bytes: int = Field(
+        64 * 1024 * 1024, ge=0, description="Byte budget of the in-process execution cache"
+    )
+    code_cache_ttl_seconds: int = Field(
+        3600, ge=1, description="Expiry for entries in the shared execution cache"
+    )
+    code_cache_shared: bool = Field(
+        False, description="Also cache execution results in Redis across workers"
+    )
+
+    # Live session WebSocket settings
+    ws_heartbeat_seconds: float = Field(20.0, gt=0, description="Interval between server pings")
+    ws_idle_timeout_seconds: float = Field(
+        60.0, gt=0, description="Close live connections silent for longer than this"
+    )
+    ws_send_queue_size: int = Field(
+        256, ge=1, description="Outgoing frames buffered per connection before producers wait"
+    )
+
+    # Metrics settings
+    event_loop_lag_interval_seconds: float = Field(
+        0.5, ge=0, description="How often event loop lag is sampled; 0 disables the sampler"
+    )
+
+    # Request profiling settings
+    profiling_enabled: bool = Field(False, description="Install the sampling profiler middleware")
+    profiling_sample_rate: float = Field(
+        0.0, ge=0, le=1, description="Fraction of requests profiled without being asked to"
+    )
+    profiling_header: str = Field("X-Profile", description="Request header that asks for a profile")
+    profiling_token: Optional[str] = Field(
+        None,
+        description="Value the profiling header must carry; without one the header is ignored",
+    )
+    profiling_interval_seconds: float = Field(
+        0.005, gt=0, description="Stack sampling interval while a profiled request runs"
+    )
+    profiling_dir: Optional[str] = Field(
+        None, description="Where profiles are written (defaults to <tmp>/mockloop-profiles)"
+    )
+    profiling_max_profiles: int = Field(
+        200, ge=1, description="Profiles kept on disk before the oldest are deleted"
+    )
+
+    # Autosave settings
+    autosave_flush_interval_seconds: float = Field(
+        5.0,
+        ge=0,
+        description="How often buffered progress saves are flushed; 0 writes every save through",
+    )
+    autosave_backend: str = Field(
+        "memory",
+        description='Where pending saves wait for a flush: "memory" (per process) or "redis"',
+    )
+
+    # Code snapshot history settings
+    code_snapshot_keyframe_interval: int = Field(
+        32, ge=1, description="Store the full code every N revisions; diffs in between"
+    )
+    code_snapshot_compression_level: int = Field(
+        6, ge=0, le=9, description="zlib level for snapshot payloads (0 stores uncompressed)"
+    )
+
+    # Prompt catalog settings
+    prompt_catalog_path: Optional[str] = Field(
+        None, description="Question bank JSON file (defaults to the bundled app/data/prompts.json)"
+    )
+
+    # Interview session store settings
+    interview_session_backend: str = Field(
+        "memory",
+        description='Where /api/interviews sessions live: "memory" (per process) or "redis"',
+    )
+    interview_session_max_entries: int = Field(
+        10_000, ge=1, description="Sessions kept by the in-process store before evicting"
+    )
+    interview_session_ttl_seconds: int = Field(
+        6 * 3600, ge=60, description="How long an interview session stays resumable"
+    )
+
+    # Background job settings
+    job_backend: str = Field(
+        "memory",
+        description='Where queued jobs wait for a worker: "memory" (per process) or "redis"',
+    )
+    job_concurrency: int = Field(4, ge=1, description="Jobs run at the same time per API process")
+    job_max_attempts: int = Field(3, ge=1, description="Attempts before a job is marked failed")
+    job_visibility_timeout_seconds: float = Field(
+        60.0, gt=0, description="A job not finished within this is abandoned and retried"
+    )
+    job_result_ttl_seconds: int = Field(
+        3600, ge=60, description="How long finished jobs and their results can be fetched"
+    )
 
     @property
     def database_url(self) -> str:
         """Construct database URL from components."""
-        return f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+        if self.database_url_override:
+            return self.database_url_override
+        return (
+            f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}"
+            f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+        )
 
     @property
     def redis_url(self) -> str:
@@ -1,9 +1,10 @@
 """Database package for MockLoop API."""
 
 from .connection import engine, SessionLocal, get_db, init_db, close_db
-from .models import Base, User, Interview, InterviewMessage, Scorecard, Session
+from .expressions import json_merge
+from .models import Base, User, Interview, InterviewMessage, CodeSnapshot, Scorecard, Session
 
 __all__ = [
-    "engine", "SessionLocal", "get_db", "init_db", "close_db",
-    "Base", "User", "Interview", "InterviewMessage", "Scorecard", "Session"
+    "engine", "SessionLocal", "get_db", "init_db", "close_db", "json_merge",
+    "Base", "User", "Interview", "InterviewMessage", "CodeSnapshot", "Scorecard", "Session"
 ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 """Database connection management with async SQLAlchemy."""
 
 import logging
+import time
 from typing import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import (
@@ -9,8 +10,10 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from ..config import get_settings
+from ..services.metrics import registry
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -18,6 +21,26 @@ logger = logging.getLogger(__name__)
 # Get settings
 settings = get_settings()
 
+POOL_CHECKOUT_WAIT_SECONDS = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to obtain a pooled connection, including opening a new one",
+)
+POOL_CONNECTIONS = registry.gauge(
+    "db_pool_connections", "Pooled database connections by state", ("state",)
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Default async queue pool that records how long checkouts wait."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
 # Create async engine with connection pooling
 engine = create_async_engine(
     settings.database_url,
@@ -26,8 +49,14 @@ engine = create_async_engine(
     max_overflow=20,  # Additional connections beyond pool_size
     pool_pre_ping=True,  # Validate connections before use
     pool_recycle=3600,  # Recycle connections after 1 hour
+    poolclass=InstrumentedQueuePool,
 )
 
+# Read at scrape time; ``engine.pool`` is replaced when the engine is disposed.
+POOL_CONNECTIONS.set_function(lambda: engine.pool.checkedout(), "in_use")
+POOL_CONNECTIONS.set_function(lambda: engine.pool.checkedin(), "idle")
+POOL_CONNECTIONS.set_function(lambda: max(0, engine.pool.overflow()), "overflow")
+
 # Create session factory
 SessionLocal = async_sessionmaker(
     engine,
@@ -0,0 +1,46 @@
+"""Dialect-aware SQL expressions used by the API."""
+
+from typing import Any
+
+from sqlalchemy import JSON, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+# JSON on every backend, JSONB on PostgreSQL so it supports the || operator.
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+class json_merge(FunctionElement):
+    """
+    Shallow-merge a JSON object patch into a JSON column, server side.
+
+    Renders ``COALESCE(col, '{}') || :patch`` on PostgreSQL and
+    ``json_patch(COALESCE(col, '{}'), :patch)`` elsewhere (SQLite), so the
+    merge happens inside the UPDATE instead of in a read-modify-write cycle.
+    """
+
+    type = JSONDocument
+    name = "json_merge"
+    inherit_cache = True
+
+    def __init__(self, column: Any, patch: dict):
+        super().__init__(column, literal(patch, type_=JSONDocument))
+
+
+@compiles(json_merge, "postgresql")
+def _json_merge_postgresql(element, compiler, **kw):
+    column, patch = element.clauses
+    return "COALESCE(%s, '{}'::jsonb) || %s" % (
+        compiler.process(column, **kw),
+        compiler.process(patch, **kw),
+    )
+
+
+@compiles(json_merge)
+def _json_merge_default(element, compiler, **kw):
+    column, patch = element.clauses
+    return "json_patch(COALESCE(%s, '{}'), %s)" % (
+        compiler.process(column, **kw),
+        compiler.process(patch, **kw),
+    )
@@ -2,9 +2,11 @@
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, JSON, Index, LargeBinary
 from sqlalchemy.orm import DeclarativeBase
 
+from .expressions import JSONDocument
+
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
@@ -41,7 +43,8 @@ class Interview(Base):
     status = Column(String(50), default="pending")  # pending, in_progress, completed, cancelled
 
     # Configuration settings
-    config = Column(JSON, nullable=True)  # Store interview configuration as JSON
+    config = Column(JSONDocument, nullable=True)  # Store interview configuration as JSON
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every progress save
 
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -50,6 +53,23 @@ class Interview(Base):
     completed_at = Column(DateTime, nullable=True)
 
 
+# Keyset pagination indexes: listings filter by owner (and optionally status)
+# and page newest first on (started_at, id).
+Index(
+    "ix_interviews_user_status_started_at",
+    Interview.user_id,
+    Interview.status,
+    Interview.started_at.desc(),
+    Interview.id.desc(),
+)
+Index(
+    "ix_interviews_user_started_at",
+    Interview.user_id,
+    Interview.started_at.desc(),
+    Interview.id.desc(),
+)
+
+
 class InterviewMessage(Base):
     """Messages exchanged during an interview session."""
 
@@ -63,6 +83,39 @@ class InterviewMessage(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
 
 
+# Transcript reads are range scans within one interview: by sequence (id) for
+# incremental replay, by time for scoring windows.
+Index("ix_interview_messages_interview_id_id", InterviewMessage.interview_id, InterviewMessage.id)
+Index(
+    "ix_interview_messages_interview_id_timestamp",
+    InterviewMessage.interview_id,
+    InterviewMessage.timestamp,
+)
+
+
+class CodeSnapshot(Base):
+    """One revision of a session's code, stored as a keyframe or a diff."""
+
+    __tablename__ = "code_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    interview_id = Column(Integer, nullable=False)  # FK to interviews table
+    revision = Column(Integer, nullable=False)  # 0, 1, 2, ... per interview
+    is_keyframe = Column(Boolean, nullable=False, default=False)  # Full text rather than a diff
+    payload = Column(LargeBinary, nullable=False)  # zlib-compressed text or JSON diff
+    code_size = Column(Integer, nullable=False)  # Uncompressed length of this revision
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Reconstructing a revision scans from its keyframe forward within one interview.
+Index(
+    "ix_code_snapshots_interview_id_revision",
+    CodeSnapshot.interview_id,
+    CodeSnapshot.revision,
+    unique=True,
+)
+
+
 class Scorecard(Base):
     """Interview evaluation and scoring."""
 
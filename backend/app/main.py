@@ -5,10 +5,21 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from .config import get_settings
-from .database import init_db, close_db
-from .routers import interviews, sessions, code_execution
+from .database import engine, init_db, close_db
+from .routers import interviews, sessions, code_execution, live, jobs
+from .services import metrics
+from .services.autosave import get_autosave_buffer
+from .services.execution_cache import get_execution_cache
+from .services.instrumentation import RequestMetricsMiddleware, get_loop_lag_monitor
+from .services.jobs import get_job_pool
+from .services.llm import close_llm_client
+from .services.profiling import install_profiling
+from .services.prompt_catalog import get_prompt_catalog
+from .services.sandbox import get_sandbox_pool
+from .services.session_store import get_session_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,13 +32,25 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting MockLoop API...")
     await init_db()
+    await get_loop_lag_monitor().start()
+    get_prompt_catalog()
+    await get_sandbox_pool().start()
+    await get_autosave_buffer().start()
+    await get_job_pool().start()
     logger.info("MockLoop API started successfully!")
 
     yield
 
     # Shutdown
     logger.info("Shutting down MockLoop API...")
+    await get_job_pool().close()
+    await get_autosave_buffer().close()
+    await get_sandbox_pool().close()
+    await get_execution_cache().close()
+    await get_session_store().close()
+    await close_llm_client()
     await close_db()
+    await get_loop_lag_monitor().close()
     logger.info("MockLoop API shutdown complete!")
 
 
@@ -51,7 +74,11 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[sessions.NEXT_CURSOR_HEADER],
     )
+    install_profiling(app, engine)
+    # Outermost, so CORS handling and preflights are timed too.
+    app.add_middleware(RequestMetricsMiddleware)
 
     @app.get("/health", tags=["system"])
     def healthcheck():
@@ -61,9 +88,15 @@ def create_app() -> FastAPI:
             "app_name": settings.app_name
         }
 
+    @app.get("/metrics", tags=["system"], response_class=PlainTextResponse)
+    def metrics_endpoint():
+        return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
     app.include_router(interviews.router)
     app.include_router(sessions.router)
     app.include_router(code_execution.router)
+    app.include_router(live.router)
+    app.include_router(jobs.router)
     return app
 
 
@@ -1,13 +1,26 @@
 """Code execution endpoints for MockLoop interview platform."""
 
-import subprocess
-import tempfile
-import os
-import sys
-from typing import Dict, Any
+import asyncio
+import json
+from typing import AsyncIterator, Awaitable, List, Optional, TypeVar
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+
+from ..services.execution_cache import (
+    cache_key,
+    get_execution_cache,
+    is_deterministic,
+    shows_addresses,
+)
+from ..services.sandbox import SandboxBusy, get_limit_profile, get_sandbox_pool
+
+T = TypeVar("T")
+
+# How often an in-flight run checks whether the client is still connected.
+DISCONNECT_POLL_SECONDS = 0.25
 
 router = APIRouter(prefix="/api/code", tags=["code-execution"])
 
@@ -16,130 +29,321 @@ class CodeExecutionRequest(BaseModel):
     code: str
     language: str = "python"
     test_cases: list[str] = []
+    difficulty: Optional[str] = Field(
+        None, description="Interview difficulty selecting the resource limit profile"
+    )
+
+
+class ExecutionUsage(BaseModel):
+    wall_ms: float = Field(..., description="Wall time spent inside candidate code")
+    cpu_user_ms: float = 0.0
+    cpu_system_ms: float = 0.0
+    peak_rss_kb: int = Field(0, description="Worker resident set high-water mark")
+    stdout_bytes: int = 0
+    stderr_bytes: int = 0
+    queue_wait_ms: float = Field(0.0, description="Time spent waiting for a free worker")
+    runner_overhead_ms: float = Field(
+        0.0, description="Runner time outside candidate code (pipe I/O, serialization)"
+    )
 
 
 class CodeExecutionResponse(BaseModel):
     output: str
     error: str = ""
     success: bool
-    execution_time_ms: int = 0
+    error_type: Optional[str] = Field(
+        None,
+        description="Structured failure such as timeout, memory_limit_exceeded, "
+        "cpu_limit_exceeded, file_size_limit_exceeded or process_limit_exceeded",
+    )
+    execution_time_ms: float = 0
+    usage: Optional[ExecutionUsage] = None
+    cached: bool = False
+
+
+class TestCase(BaseModel):
+    input: str = Field(..., description="Expression or statement evaluated against the solution")
+    expected: Optional[str] = Field(
+        None, description="Expression whose value the input must equal to pass"
+    )
+
+
+class BatchExecutionRequest(BaseModel):
+    code: str
+    language: str = "python"
+    test_cases: List[TestCase] = Field(..., max_length=200)
+    case_timeout_ms: int = Field(2000, ge=10, le=10_000)
+    difficulty: Optional[str] = None
+
+
+class TestCaseResult(BaseModel):
+    input: str
+    passed: bool
+    output: str = ""
+    result: Optional[str] = None
+    expected: Optional[str] = None
+    error: str = ""
+    elapsed_ms: float = 0.0
+    timed_out: bool = False
+    error_type: Optional[str] = None
+
+
+class BatchExecutionResponse(BaseModel):
+    success: bool = Field(..., description="Whether the solution itself loaded cleanly")
+    output: str = ""
+    error: str = ""
+    error_type: Optional[str] = None
+    passed: int
+    failed: int
+    total: int
+    cases: List[TestCaseResult]
+    execution_time_ms: float = 0
+    usage: Optional[ExecutionUsage] = None
+    cached: bool = False
+
+
+def build_script(code: str, test_cases: list[str]) -> str:
+    """Append valid test cases to ``code``, printing the value of expressions."""
+    code_to_execute = code
+
+    # Add test cases to the code if provided and valid
+    if test_cases:
+        valid_test_cases = []
+        for test_case in test_cases:
+            # Clean and validate test case
+            cleaned_test_case = test_case.strip()
+
+            # Skip empty test cases
+            if not cleaned_test_case:
+                continue
+
+            # Skip comment-only test cases (starts with #)
+            if cleaned_test_case.startswith('#'):
+                continue
+
+            # Try to validate the test case as a Python expression
+            try:
+                # This will raise SyntaxError if invalid
+                compile(cleaned_test_case, '<string>', 'eval')
+                valid_test_cases.append(cleaned_test_case)
+            except SyntaxError:
+                # If it's not a valid expression, try as a statement
+                try:
+                    compile(cleaned_test_case, '<string>', 'exec')
+                    valid_test_cases.append(cleaned_test_case)
+                except SyntaxError:
+                    # Skip invalid test cases
+                    continue
+
+        # Add valid test cases to code
+        if valid_test_cases:
+            code_to_execute += "\n\n# Test cases\n"
+            for test_case in valid_test_cases:
+                # For expressions, wrap in print; for statements, execute directly
+                try:
+                    compile(test_case, '<string>', 'eval')
+                    code_to_execute += f"print({test_case})\n"
+                except SyntaxError:
+                    # It's a statement, execute directly
+                    code_to_execute += f"{test_case}\n"
+
+    return code_to_execute
+
+
+class ClientDisconnected(Exception):
+    """Raised when the caller went away before its run finished."""
+
+
+async def run_until_disconnected(http_request: Request, job: Awaitable[T]) -> T:
+    """Await ``job`` but cancel it as soon as the client disconnects."""
+    task = asyncio.ensure_future(job)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+            # Let the pool reclaim (and recycle) the worker before returning.
+            await asyncio.gather(task, return_exceptions=True)
+
+
+async def run_sandboxed(http_request: Request, job: Awaitable[T]) -> T:
+    """Run a sandbox job, translating runner failures into HTTP errors."""
+    try:
+        return await run_until_disconnected(http_request, job)
+    except SandboxBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ClientDisconnected:
+        # Nobody is listening any more; 499 mirrors nginx's "client closed request".
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to execute code: {str(e)}")
 
 
 @router.post("/execute", response_model=CodeExecutionResponse)
-async def execute_code(request: CodeExecutionRequest):
-    """Execute code safely and return the output."""
+async def execute_code(request: CodeExecutionRequest, http_request: Request):
+    """Execute code on a warm sandbox worker and return the output."""
 
     if request.language.lower() != "python":
         raise HTTPException(status_code=400, detail="Only Python is currently supported")
 
-    try:
-        # Create a temporary file for the code
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as temp_file:
-            # Start with the user's code
-            code_to_execute = request.code
-
-            # Add test cases to the code if provided and valid
-            if request.test_cases:
-                valid_test_cases = []
-                for test_case in request.test_cases:
-                    # Clean and validate test case
-                    cleaned_test_case = test_case.strip()
-
-                    # Skip empty test cases
-                    if not cleaned_test_case:
-                        continue
-
-                    # Skip comment-only test cases (starts with #)
-                    if cleaned_test_case.startswith('#'):
-                        continue
-
-                    # Try to validate the test case as a Python expression
-                    try:
-                        # This will raise SyntaxError if invalid
-                        compile(cleaned_test_case, '<string>', 'eval')
-                        valid_test_cases.append(cleaned_test_case)
-                    except SyntaxError:
-                        # If it's not a valid expression, try as a statement
-                        try:
-                            compile(cleaned_test_case, '<string>', 'exec')
-                            valid_test_cases.append(cleaned_test_case)
-                        except SyntaxError:
-                            # Skip invalid test cases
-                            continue
-
-                # Add valid test cases to code
-                if valid_test_cases:
-                    code_to_execute += "\n\n# Test cases\n"
-                    for test_case in valid_test_cases:
-                        # For expressions, wrap in print; for statements, execute directly
-                        try:
-                            compile(test_case, '<string>', 'eval')
-                            code_to_execute += f"print({test_case})\n"
-                        except SyntaxError:
-                            # It's a statement, execute directly
-                            code_to_execute += f"{test_case}\n"
-
-            temp_file.write(code_to_execute)
-            temp_file_path = temp_file.name
-
-        try:
-            # Execute the code with timeout
-            result = subprocess.run(
-                [sys.executable, temp_file_path],
-                capture_output=True,
-                text=True,
-                timeout=10,  # 10 second timeout
-                cwd=tempfile.gettempdir()
-            )
-
-            output = result.stdout
-            error = result.stderr
-            success = result.returncode == 0
-
-            # Clean output
-            if not output and not error:
-                output = "Code executed successfully (no output)"
-
-            return CodeExecutionResponse(
-                output=output,
-                error=error,
-                success=success,
-                execution_time_ms=0  # TODO: Add timing
-            )
-
-        except subprocess.TimeoutExpired:
-            return CodeExecutionResponse(
-                output="",
-                error="Code execution timed out after 10 seconds",
-                success=False
-            )
-        except Exception as e:
-            return CodeExecutionResponse(
-                output="",
-                error=f"Execution error: {str(e)}",
-                success=False
-            )
+    pool = get_sandbox_pool()
+    cache = get_execution_cache()
+    limits = get_limit_profile(request.difficulty)
+    code_to_execute = build_script(request.code, request.test_cases)
+    cacheable = is_deterministic(code_to_execute)
+    key = cache_key(
+        "execute",
+        language=request.language.lower(),
+        code=request.code,
+        test_cases=request.test_cases,
+        limits=[pool.timeout, pool.max_output_bytes, limits],
+    )
+    if cacheable:
+        hit = await cache.get(key)
+        if hit is not None:
+            return CodeExecutionResponse(**hit, cached=True)
+
+    result = await run_sandboxed(http_request, pool.execute(code_to_execute, limits))
+
+    output = result.stdout
+    error = result.stderr
+
+    # Clean output
+    if not output and not error:
+        output = "Code executed successfully (no output)"
+
+    response = CodeExecutionResponse(
+        output=output,
+        error=error,
+        success=result.success,
+        error_type=result.error_type,
+        execution_time_ms=result.usage["wall_ms"],
+        usage=ExecutionUsage(**result.usage),
+    )
+    if cacheable and result.reproducible and not shows_addresses(output + error):
+        await cache.set(key, response.model_dump(exclude={"cached"}))
+    return response
+
+
+async def _sse_events(stream) -> AsyncIterator[bytes]:
+    """Encode sandbox frames as server-sent events."""
+    async for frame in stream:
+        if frame["type"] == "output":
+            event, data = frame["stream"], frame["data"]
+        else:
+            event, data = "exit", frame
+        yield f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+@router.post("/execute/stream")
+async def execute_code_stream(request: CodeExecutionRequest):
+    """Execute code and stream its output as server-sent events.
 
+    ``stdout``/``stderr`` events carry JSON-encoded text chunks as the program
+    writes them; a final ``exit`` event carries the status, structured error
+    type and resource usage. Output beyond ``sandbox_max_output_bytes`` stops
+    the program with ``error_type: "output_limit_exceeded"``.
+    """
+
+    if request.language.lower() != "python":
+        raise HTTPException(status_code=400, detail="Only Python is currently supported")
+
+    code_to_execute = build_script(request.code, request.test_cases)
+    limits = get_limit_profile(request.difficulty)
+    try:
+        stream = await get_sandbox_pool().stream(code_to_execute, limits)
+    except SandboxBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to execute code: {str(e)}")
 
-    finally:
-        # Clean up temporary file
-        try:
-            if 'temp_file_path' in locals():
-                os.unlink(temp_file_path)
-        except:
-            pass  # Ignore cleanup errors
+    return StreamingResponse(
+        _sse_events(stream),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Releases the worker even if the client disconnects before the end.
+        background=BackgroundTask(stream.aclose),
+    )
+
+
+@router.post("/test", response_model=BatchExecutionResponse)
+async def run_test_cases(request: BatchExecutionRequest, http_request: Request):
+    """Load the solution once and grade every test case in a single worker run."""
+
+    if request.language.lower() != "python":
+        raise HTTPException(status_code=400, detail="Only Python is currently supported")
+
+    pool = get_sandbox_pool()
+    cache = get_execution_cache()
+    limits = get_limit_profile(request.difficulty)
+    cases = [case.model_dump() for case in request.test_cases]
+    source = request.code + "\n".join(case["input"] + (case["expected"] or "") for case in cases)
+    cacheable = is_deterministic(source)
+    key = cache_key(
+        "test",
+        language=request.language.lower(),
+        code=request.code,
+        test_cases=cases,
+        case_timeout_ms=request.case_timeout_ms,
+        limits=[pool.timeout, pool.max_output_bytes, limits],
+    )
+    if cacheable:
+        hit = await cache.get(key)
+        if hit is not None:
+            return BatchExecutionResponse(**hit, cached=True)
+
+    result = await run_sandboxed(
+        http_request,
+        pool.run_tests(request.code, cases, request.case_timeout_ms / 1000, limits),
+    )
+
+    case_results = [TestCaseResult(**case) for case in result.cases]
+    passed = sum(1 for case in case_results if case.passed)
+    response = BatchExecutionResponse(
+        success=result.success,
+        output=result.stdout,
+        error=result.stderr,
+        error_type=result.error_type,
+        passed=passed,
+        failed=len(request.test_cases) - passed,
+        total=len(request.test_cases),
+        cases=case_results,
+        execution_time_ms=result.usage["wall_ms"],
+        usage=ExecutionUsage(**result.usage),
+    )
+    # Per-case timeouts depend on machine load, so only cache clean runs.
+    if (
+        cacheable
+        and result.reproducible
+        and not any(case.timed_out for case in case_results)
+        and not shows_addresses(response.model_dump_json())
+    ):
+        await cache.set(key, response.model_dump(exclude={"cached"}))
+    return response
 
 
 @router.post("/validate")
 async def validate_code(request: CodeExecutionRequest):
     """Validate code syntax without executing."""
+    cache = get_execution_cache()
+    # compile() is cheap enough that a round-trip to Redis would cost more.
+    key = cache_key("validate", language=request.language.lower(), code=request.code)
+    hit = await cache.get(key, shared=False)
+    if hit is not None:
+        return hit
+
     try:
         compile(request.code, '<string>', 'exec')
-        return {"valid": True, "error": ""}
+        result = {"valid": True, "error": ""}
     except SyntaxError as e:
-        return {
+        result = {
             "valid": False,
             "error": f"Syntax error on line {e.lineno}: {e.msg}"
-        }
\ No newline at end of file
+        }
+    await cache.set(key, result, shared=False)
+    return result
\ No newline at end of file
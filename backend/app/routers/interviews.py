@@ -1,17 +1,21 @@
 """Interview session endpoints."""
 
+import json
+import time
 from datetime import datetime
-from typing import Dict, List
+from typing import Any, AsyncIterator, Dict, List, Tuple
 from uuid import UUID, uuid4
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from ..services.mock_ai import (
-    InterviewFeedback,
-    InterviewPrompt,
-    MockInterviewEngine,
-)
+from ..services.jobs import PermanentJobError, get_job_pool, job_handler
+from ..services.llm import LLMError, get_interview_engine
+from ..services.mock_ai import InterviewFeedback, InterviewPrompt
+from ..services.scoring import ScoreAccumulator
+from ..services.session_store import get_session_store
+from .jobs import JobAccepted, job_accepted
 
 
 router = APIRouter(prefix="/api/interviews", tags=["interviews"])
@@ -30,7 +34,7 @@ class InterviewRequest(BaseModel):
 
 
 class InterviewSession(BaseModel):
-    """Represents a lightweight session kept in-memory."""
+    """Represents a lightweight session kept in the session store."""
 
     session_id: UUID
     started_at: datetime
@@ -45,35 +49,132 @@ class TranscriptEvent(BaseModel):
     payload: Dict[str, str] = Field(default_factory=dict)
 
 
+class TranscriptBatch(BaseModel):
+    """Events posted while the interview is running."""
+
+    events: List[TranscriptEvent]
+
+
+class InterviewerTurn(BaseModel):
+    """A candidate message the interviewer should respond to."""
+
+    message: str = Field(..., max_length=8000)
+
+
 class EndInterviewRequest(BaseModel):
     """Payload for finalizing an interview."""
 
-    transcript: List[TranscriptEvent]
+    transcript: List[TranscriptEvent] = Field(
+        default_factory=list,
+        description="Events not already posted to /events",
+    )
+
+
+async def _load_record(session_id: UUID) -> Tuple[InterviewSession, ScoreAccumulator]:
+    """Load a session and its running scores, which live in the same record.
+
+    Keeping both under one key means the store can never evict or expire one
+    without the other.
+    """
+    stored = await get_session_store().get(str(session_id))
+    if not stored:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return (
+        InterviewSession.model_validate_json(stored),
+        ScoreAccumulator.from_dict(json.loads(stored).get("scores")),
+    )
 
 
-mock_engine = MockInterviewEngine()
-sessions: Dict[UUID, InterviewSession] = {}
+async def _load_session(session_id: UUID) -> InterviewSession:
+    session, _ = await _load_record(session_id)
+    return session
 
 
 @router.post("", response_model=InterviewSession)
-def start_interview(payload: InterviewRequest) -> InterviewSession:
+async def start_interview(payload: InterviewRequest) -> InterviewSession:
     """Create a new interview session and return scripted prompts."""
     session = InterviewSession(
         session_id=uuid4(),
         started_at=datetime.utcnow(),
         request=payload,
-        prompts=mock_engine.generate_prompts(payload),
+        prompts=get_interview_engine().generate_prompts(payload),
     )
-    sessions[session.session_id] = session
+    await get_session_store().set(str(session.session_id), session.model_dump_json())
     return session
 
 
-@router.post("/{session_id}/end", response_model=InterviewFeedback)
-def finalize_interview(session_id: UUID, payload: EndInterviewRequest) -> InterviewFeedback:
-    """Generate mock feedback for a finished session."""
-    session = sessions.get(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+@job_handler("interview_feedback")
+async def generate_interview_feedback(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Score a finished session from its running aggregates plus any trailing events."""
+    try:
+        session, scores = await _load_record(UUID(payload["session_id"]))
+    except HTTPException:
+        raise PermanentJobError("Session not found or expired") from None
+    scores.extend(TranscriptEvent.model_validate(event) for event in payload["transcript"])
+    feedback: InterviewFeedback = get_interview_engine().finalize_feedback(session, scores)
+    return feedback.model_dump()
+
+
+@router.post("/{session_id}/end", status_code=202, response_model=JobAccepted)
+async def finalize_interview(session_id: UUID, payload: EndInterviewRequest) -> JobAccepted:
+    """Queue feedback generation for a finished session; poll the job for the result."""
+    await _load_session(session_id)
+    job = await get_job_pool().submit(
+        "interview_feedback",
+        {
+            "session_id": str(session_id),
+            "transcript": [event.model_dump() for event in payload.transcript],
+        },
+    )
+    return job_accepted(job)
+
+
+async def _reply_events(session: InterviewSession, message: str) -> AsyncIterator[bytes]:
+    """Encode interviewer reply tokens as server-sent events."""
+    started = time.perf_counter()
+    first_token_ms = None
+    try:
+        async for token in get_interview_engine().stream_reply(session, message):
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - started) * 1000
+            yield f"event: token\ndata: {json.dumps(token)}\n\n".encode()
+    except LLMError as exc:
+        yield f"event: error\ndata: {json.dumps({'error': str(exc)})}\n\n".encode()
+        return
+    done = {
+        "first_token_ms": first_token_ms,
+        "total_ms": (time.perf_counter() - started) * 1000,
+    }
+    yield f"event: done\ndata: {json.dumps(done)}\n\n".encode()
+
+
+@router.post("/{session_id}/reply")
+async def interviewer_reply(session_id: UUID, payload: InterviewerTurn):
+    """Stream the interviewer's reply token by token as server-sent events.
+
+    ``token`` events carry JSON-encoded text as soon as the model emits it; a
+    final ``done`` event reports time to first token, or ``error`` if the model
+    failed.
+    """
+    session = await _load_session(session_id)
+    return StreamingResponse(
+        _reply_events(session, payload.message),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/{session_id}/events")
+async def record_events(session_id: UUID, payload: TranscriptBatch) -> Dict[str, int]:
+    """Fold transcript events into the session's running scores as they happen."""
 
-    feedback = mock_engine.generate_feedback(session, payload.transcript)
-    return feedback
+    def fold(stored: str) -> str:
+        record = json.loads(stored)
+        scores = ScoreAccumulator.from_dict(record.get("scores")).extend(payload.events)
+        record["scores"] = scores.to_dict()
+        return json.dumps(record)
+
+    updated = await get_session_store().update(str(session_id), fold)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"received": len(payload.events), "touches": json.loads(updated)["scores"]["touches"]}
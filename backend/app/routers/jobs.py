@@ -0,0 +1,64 @@
+"""Background job status endpoints."""
+
+from typing import Any, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from ..services.jobs import Job, get_job_pool
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+# Upper bound for long-polling so proxies do not cut the request first.
+MAX_WAIT_SECONDS = 30.0
+
+
+class JobAccepted(BaseModel):
+    """Returned by endpoints that hand their work to a background job."""
+
+    job_id: str
+    kind: str
+    status: str
+    status_url: str
+
+
+class JobStatus(BaseModel):
+    """Current state of a background job and its result once finished."""
+
+    job_id: str
+    kind: str
+    status: str
+    attempts: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+
+def job_accepted(job: Job) -> JobAccepted:
+    return JobAccepted(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        status_url=f"{router.prefix}/{job.id}",
+    )
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(
+    job_id: str,
+    wait: float = Query(
+        0, ge=0, le=MAX_WAIT_SECONDS, description="Hold the request up to this long for the job to finish"
+    ),
+) -> JobStatus:
+    """Poll a job; with ``wait`` the response is sent as soon as the job finishes."""
+    pool = get_job_pool()
+    job = await pool.wait(job_id, wait) if wait else await pool.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatus(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        attempts=job.attempts,
+        result=job.result,
+        error=job.error,
+    )
@@ -0,0 +1,410 @@
+"""Real-time interview channel over a WebSocket.
+
+One connection per open interview room multiplexes everything the editor and
+chat used to send as separate REST calls. Every frame is a JSON object with a
+``type``:
+
+Client to server
+    ``code``       full editor contents ``{"code": str}``
+    ``code_diff``  splice ``{"start": int, "end": int, "text": str}``; offsets
+                   count UTF-16 code units, as JavaScript string indices do
+    ``time``       ``{"elapsed": int}`` seconds spent so far
+    ``chat``       ``{"message": str}`` candidate message to the interviewer
+    ``run``        ``{"id": str, "code"?: str, "test_cases"?: [str], "difficulty"?: str}``
+    ``ping``       liveness probe, answered with ``pong``
+
+Server to client
+    ``hello``, ``ack`` (``seq`` echoed from code frames), ``resync`` (full code
+    after a diff that did not apply), ``token``/``reply_done`` (interviewer
+    reply), ``output``/``exit`` (code run, tagged with the run ``id``),
+    ``ping``/``pong``, ``error`` (also sent for frames whose payload is
+    malformed; the connection stays open).
+
+Editor changes go to the autosave buffer (or, with the buffer off, are
+coalesced per connection and written at most every ``SAVE_DEBOUNCE_SECONDS``)
+and chat lines are batched into the transcript store, so chatty traffic costs a
+frame rather than a request and a database session. Binary frames are answered
+with an ``error``. Outgoing frames pass through a bounded queue drained by a
+single writer: a slow client blocks producers (including sandbox output)
+instead of growing memory. The server pings every ``ws_heartbeat_seconds`` and
+closes connections that stay silent for ``ws_idle_timeout_seconds``.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+import orjson
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from sqlalchemy import select
+
+from ..config import get_settings
+from ..database import SessionLocal, Interview
+from ..services.autosave import get_autosave_buffer, persist_progress
+from ..services.llm import LLMError, get_interview_engine
+from ..services.prompt_catalog import focus_for_role, get_prompt_catalog
+from ..services.sandbox import SandboxBusy, get_limit_profile, get_sandbox_pool
+from ..services.session_ids import session_filter
+from ..services.snapshots import latest_revision
+from ..services.transcripts import append_events
+from .code_execution import build_script
+from .interviews import InterviewRequest, InterviewSession
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["live"])
+
+# Application close codes (4000-4999 are reserved for applications).
+CLOSE_NOT_FOUND = 4404
+CLOSE_IDLE = 4408
+# Abnormal closure, used when the writer can no longer reach the client.
+CLOSE_ABNORMAL = 1006
+
+# Characters outside the BMP take two UTF-16 code units in the browser.
+_ASTRAL = re.compile("[\U00010000-\U0010FFFF]")
+_REQUIRED = object()
+
+
+class InvalidFrame(ValueError):
+    """A client frame whose payload does not match the protocol."""
+
+
+def _field(message: dict, key: str, kind, default: Any = _REQUIRED) -> Any:
+    """Return ``message[key]`` if it has type ``kind``; raise :class:`InvalidFrame` otherwise."""
+    value = message.get(key, default)
+    if value is _REQUIRED:
+        raise InvalidFrame(f"Missing field {key!r}")
+    if value is not default and (not isinstance(value, kind) or isinstance(value, bool)):
+        raise InvalidFrame(f"Field {key!r} has the wrong type")
+    return value
+
+
+def utf16_index(text: str, offset: int) -> Optional[int]:
+    """Code point index in ``text`` of a UTF-16 code unit ``offset``.
+
+    Returns ``None`` when the offset is out of range or falls inside a
+    surrogate pair.
+    """
+    astral = 0
+    for match in _ASTRAL.finditer(text):
+        unit = match.start() + astral
+        if offset <= unit:
+            break
+        if offset == unit + 1:
+            return None
+        astral += 1
+    index = offset - astral
+    return index if 0 <= index <= len(text) else None
+
+
+class LiveSession:
+    """State and tasks for one connected interview room."""
+
+    # With the autosave buffer off, editor changes are written at most this
+    # often rather than once per keystroke.
+    SAVE_DEBOUNCE_SECONDS = 1.0
+
+    def __init__(self, websocket: WebSocket, session_id: str, interview_id: int, config: dict):
+        settings = get_settings()
+        self.websocket = websocket
+        self.session_id = session_id
+        self.interview_id = interview_id
+        self.config = config
+        self.code: str = config.get("current_code") or ""
+        self.heartbeat_seconds = settings.ws_heartbeat_seconds
+        self.idle_timeout = settings.ws_idle_timeout_seconds
+        self.outbox: "asyncio.Queue[Optional[dict]]" = asyncio.Queue(settings.ws_send_queue_size)
+        self.pending_events: List[Dict[str, Any]] = []
+        self.unsaved: Dict[str, Any] = {}
+        self.last_seen = time.monotonic()
+        self.tasks: Set[asyncio.Task] = set()
+        self.running: Optional[asyncio.Task] = None
+        self.replying: Optional[asyncio.Task] = None
+        self.saving: Optional[asyncio.Task] = None
+        self.writer: Optional[asyncio.Task] = None
+
+    async def send(self, message: dict) -> None:
+        """Queue a frame; waits when the client is not keeping up.
+
+        Raises :class:`WebSocketDisconnect` once the writer has stopped, so
+        producers never wait on a queue nobody drains.
+        """
+        if self.writer is None or self.writer.done():
+            raise WebSocketDisconnect(CLOSE_ABNORMAL)
+        if not self.outbox.full():
+            self.outbox.put_nowait(message)
+            return
+        put = asyncio.ensure_future(self.outbox.put(message))
+        await asyncio.wait((put, self.writer), return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            raise WebSocketDisconnect(CLOSE_ABNORMAL)
+
+    async def _writer(self) -> None:
+        while True:
+            message = await self.outbox.get()
+            if message is None:
+                return
+            await self.websocket.send_text(orjson.dumps(message).decode())
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            if time.monotonic() - self.last_seen > self.idle_timeout:
+                await self.websocket.close(code=CLOSE_IDLE)
+                return
+            try:
+                await self.flush_transcript()
+            except Exception:
+                logger.exception("Failed to persist transcript for %s", self.session_id)
+            await self.send({"type": "ping", "ts": time.time()})
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self._finished)
+        return task
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self.tasks.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None and not isinstance(exc, WebSocketDisconnect):
+            logger.error("Live task failed for %s", self.session_id, exc_info=exc)
+
+    async def save(self, patch: dict) -> None:
+        buffer = get_autosave_buffer()
+        if buffer.enabled:
+            await buffer.save(self.session_id, patch)
+            return
+        self.unsaved.update(patch)
+        if self.saving is None or self.saving.done():
+            self.saving = self._spawn(self._save_later())
+
+    async def _save_later(self) -> None:
+        while self.unsaved:
+            await asyncio.sleep(self.SAVE_DEBOUNCE_SECONDS)
+            await self.flush_progress()
+
+    async def flush_progress(self) -> None:
+        """Write coalesced editor changes; they stay queued if the write fails."""
+        if not self.unsaved:
+            return
+        patch = dict(self.unsaved)
+        async with SessionLocal() as db:
+            await persist_progress(db, self.session_id, patch)
+            await db.commit()
+        for key, value in patch.items():
+            if self.unsaved.get(key) is value:
+                del self.unsaved[key]
+
+    async def flush_transcript(self) -> None:
+        """Write batched chat lines; they stay queued if the write fails."""
+        if not self.pending_events:
+            return
+        events = list(self.pending_events)
+        async with SessionLocal() as db:
+            await append_events(db, self.interview_id, events)
+            await db.commit()
+        del self.pending_events[: len(events)]
+
+    def _record(self, role: str, content: str) -> None:
+        self.pending_events.append(
+            {
+                "event_type": "chat",
+                "payload": {"role": role, "content": content},
+                "timestamp": datetime.utcnow(),
+            }
+        )
+
+    def _interviewer_session(self) -> InterviewSession:
+        company = self.config.get("company", "Generic")
+        level = self.config.get("level", "Mid-level")
+        focus = focus_for_role(self.config.get("role"))
+        prompts = get_prompt_catalog().prompts_for(
+            company, level, focus, self.config.get("difficulty", "medium")
+        )
+        return InterviewSession(
+            session_id=uuid.uuid5(uuid.NAMESPACE_URL, self.session_id),
+            started_at=datetime.utcnow(),
+            request=InterviewRequest(
+                candidate_name="Candidate",
+                target_company=company,
+                experience_level=level,
+                focus_area=focus,
+            ),
+            prompts=list(prompts.prompts),
+        )
+
+    async def _reply(self, message: str) -> None:
+        started = time.perf_counter()
+        first_token_ms = None
+        tokens: List[str] = []
+        try:
+            async for token in get_interview_engine().stream_reply(
+                self._interviewer_session(), message
+            ):
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - started) * 1000
+                tokens.append(token)
+                await self.send({"type": "token", "data": token})
+        except LLMError as exc:
+            await self.send({"type": "error", "error": str(exc), "for": "chat"})
+            return
+        self._record("assistant", "".join(tokens))
+        await self.send({"type": "reply_done", "first_token_ms": first_token_ms})
+
+    async def _run(
+        self, run_id: Any, code: str, test_cases: List[str], difficulty: Optional[str]
+    ) -> None:
+        script = build_script(code, test_cases)
+        try:
+            stream = await get_sandbox_pool().stream(
+                script, get_limit_profile(difficulty or self.config.get("difficulty"))
+            )
+        except SandboxBusy as exc:
+            await self.send({"type": "error", "error": str(exc), "for": "run", "id": run_id})
+            return
+        try:
+            async for frame in stream:
+                await self.send({**frame, "id": run_id})
+        finally:
+            await stream.aclose()
+
+    async def handle(self, message: dict) -> None:
+        kind = message.get("type")
+        if kind == "code":
+            self.code = _field(message, "code", str)
+            await self.save({"current_code": self.code})
+        elif kind == "code_diff":
+            start = utf16_index(self.code, _field(message, "start", int))
+            end = utf16_index(self.code, _field(message, "end", int))
+            text = _field(message, "text", str, "")
+            if start is None or end is None or start > end:
+                await self.send({"type": "resync", "code": self.code})
+                return
+            self.code = self.code[:start] + text + self.code[end:]
+            await self.save({"current_code": self.code})
+        elif kind == "time":
+            elapsed = _field(message, "elapsed", (int, float))
+            if elapsed < 0:
+                raise InvalidFrame("Field 'elapsed' must not be negative")
+            await self.save({"time_elapsed": int(elapsed)})
+        elif kind == "chat":
+            text = _field(message, "message", str)
+            if self.replying is not None and not self.replying.done():
+                await self.send({"type": "error", "error": "Interviewer is still replying", "for": "chat"})
+                return
+            self._record("user", text)
+            self.replying = self._spawn(self._reply(text))
+            return
+        elif kind == "run":
+            code = _field(message, "code", str, self.code)
+            difficulty = _field(message, "difficulty", str, None)
+            cases = _field(message, "test_cases", list, [])
+            if not all(isinstance(case, str) for case in cases):
+                raise InvalidFrame("Field 'test_cases' must be a list of strings")
+            if self.running is not None and not self.running.done():
+                await self.send({"type": "error", "error": "A run is already in progress", "for": "run"})
+                return
+            self.running = self._spawn(self._run(message.get("id"), code, cases, difficulty))
+            return
+        elif kind == "ping":
+            await self.send({"type": "pong", "ts": message.get("ts")})
+            return
+        else:
+            await self.send({"type": "error", "error": f"Unknown message type: {kind!r}"})
+            return
+
+        if "seq" in message:
+            await self.send({"type": "ack", "seq": message["seq"]})
+
+    async def dispatch(self, message: dict) -> None:
+        """Handle one frame; a failure is reported to the client, not fatal to the session."""
+        kind = message.get("type")
+        try:
+            await self.handle(message)
+        except WebSocketDisconnect:
+            raise
+        except InvalidFrame as exc:
+            await self.send({"type": "error", "error": str(exc), "for": kind})
+        except Exception:
+            logger.exception("Failed to handle %r frame for %s", kind, self.session_id)
+            await self.send({"type": "error", "error": "Could not process message", "for": kind})
+
+    async def serve(self) -> None:
+        writer = self.writer = asyncio.create_task(self._writer())
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            await self.send(
+                {
+                    "type": "hello",
+                    "session_id": self.session_id,
+                    "code": self.code,
+                    "heartbeat_seconds": self.heartbeat_seconds,
+                }
+            )
+            while True:
+                received = await self.websocket.receive()
+                if received["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(received.get("code", 1000))
+                self.last_seen = time.monotonic()
+                raw = received.get("text")
+                if raw is None:
+                    await self.send({"type": "error", "error": "Frames must be text"})
+                    continue
+                try:
+                    message = orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    await self.send({"type": "error", "error": "Frames must be JSON objects"})
+                    continue
+                if not isinstance(message, dict):
+                    await self.send({"type": "error", "error": "Frames must be JSON objects"})
+                    continue
+                await self.dispatch(message)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in (heartbeat, writer, *self.tasks):
+                task.cancel()
+            await asyncio.gather(heartbeat, writer, *self.tasks, return_exceptions=True)
+            try:
+                await self.flush_transcript()
+            except Exception:
+                logger.exception("Failed to persist transcript for %s", self.session_id)
+            try:
+                await self.flush_progress()
+            except Exception:
+                logger.exception("Failed to persist progress for %s", self.session_id)
+
+
+@router.websocket("/ws/sessions/{session_id}")
+async def live_session(websocket: WebSocket, session_id: str):
+    """Multiplexed live channel for one interview session."""
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(Interview.id, Interview.config).where(session_filter(session_id))
+        )
+        row = result.first()
+        if row is None:
+            # Closing before the handshake would surface as a bare HTTP 403.
+            await websocket.accept()
+            await websocket.close(code=CLOSE_NOT_FOUND)
+            return
+
+        latest = await latest_revision(db, row.id)
+
+    config = dict(row.config or {})
+    if latest is not None:
+        config["current_code"] = latest[1]
+    pending = await get_autosave_buffer().pending(session_id)
+    if pending:
+        config.update(pending)
+
+    await websocket.accept()
+    await LiveSession(websocket, session_id, row.id, config).serve()
@@ -0,0 +1,245 @@
+"""Write-behind buffer for interview autosaves.
+
+The interview room saves the full editor contents on a timer, so nearly every
+write to ``interviews.config`` is overwritten by the next one a few seconds
+later. Snapshots are accepted into a pending store instead, coalesced per
+session (later keys win), and flushed to Postgres every interval, one
+transaction per session. ``end`` flushes a session immediately, and the
+application lifespan flushes everything on graceful shutdown.
+
+The in-memory store is per process. Run with the Redis store when several API
+workers serve the same sessions, so snapshots from any worker coalesce into
+one pending patch and only one flusher claims it.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..database import SessionLocal, Interview, json_merge
+from .session_ids import session_filter
+from .snapshots import record_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+async def persist_progress(db: AsyncSession, session_id: str, patch: dict) -> Optional[int]:
+    """Merge ``patch`` into the session config; return the new version or None if missing.
+
+    ``current_code`` is not merged into the config: it is appended to the
+    session's snapshot history instead.
+    """
+    patch = dict(patch)
+    code = patch.pop("current_code", None)
+    result = await db.execute(
+        update(Interview)
+        .where(session_filter(session_id))
+        .values(config=json_merge(Interview.config, patch), version=Interview.version + 1)
+        .returning(Interview.id, Interview.version)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    if code is not None:
+        await record_snapshot(db, row.id, code)
+    return row.version
+
+
+class MemoryAutosaveStore:
+    """Pending patches held in this process."""
+
+    def __init__(self):
+        self._pending: Dict[str, dict] = {}
+
+    async def put(self, session_id: str, patch: dict) -> None:
+        self._pending.setdefault(session_id, {}).update(patch)
+
+    async def peek(self, session_id: str) -> Optional[dict]:
+        pending = self._pending.get(session_id)
+        return dict(pending) if pending else None
+
+    async def take(self, session_ids: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        if session_ids is None:
+            taken, self._pending = self._pending, {}
+            return taken
+        return {
+            session_id: self._pending.pop(session_id)
+            for session_id in session_ids
+            if session_id in self._pending
+        }
+
+    async def restore(self, session_id: str, patch: dict) -> None:
+        # Anything saved since the patch was taken is newer and must win.
+        self._pending[session_id] = {**patch, **self._pending.get(session_id, {})}
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisAutosaveStore:
+    """Pending patches shared by every API worker through Redis.
+
+    Each session's patch is a hash of JSON-encoded values, so HSET coalesces
+    snapshots natively; a set tracks which sessions are dirty.
+    """
+
+    DIRTY_KEY = "autosave:dirty"
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(redis_url)
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"autosave:pending:{session_id}"
+
+    async def put(self, session_id: str, patch: dict) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key(session_id), mapping={k: json.dumps(v) for k, v in patch.items()})
+            pipe.sadd(self.DIRTY_KEY, session_id)
+            await pipe.execute()
+
+    async def peek(self, session_id: str) -> Optional[dict]:
+        fields = await self._redis.hgetall(self._key(session_id))
+        return {k.decode(): json.loads(v) for k, v in fields.items()} or None
+
+    async def take(self, session_ids: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        if session_ids is None:
+            claimed = []
+            while True:
+                members = await self._redis.spop(self.DIRTY_KEY, 1000)
+                if not members:
+                    break
+                claimed.extend(member.decode() for member in members)
+        else:
+            claimed = list(session_ids)
+            if claimed:
+                await self._redis.srem(self.DIRTY_KEY, *claimed)
+
+        taken: Dict[str, dict] = {}
+        for session_id in claimed:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.hgetall(self._key(session_id))
+                pipe.delete(self._key(session_id))
+                fields, _ = await pipe.execute()
+            if fields:
+                taken[session_id] = {k.decode(): json.loads(v) for k, v in fields.items()}
+        return taken
+
+    async def restore(self, session_id: str, patch: dict) -> None:
+        # HSETNX keeps any field written since the patch was taken.
+        async with self._redis.pipeline(transaction=True) as pipe:
+            for field, value in patch.items():
+                pipe.hsetnx(self._key(session_id), field, json.dumps(value))
+            pipe.sadd(self.DIRTY_KEY, session_id)
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class AutosaveBuffer:
+    """Coalesces progress snapshots and flushes them on an interval."""
+
+    def __init__(self, store, flush_interval: float):
+        self.store = store
+        self.flush_interval = flush_interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.flush_interval > 0
+
+    async def save(self, session_id: str, patch: dict) -> None:
+        await self.store.put(session_id, patch)
+
+    async def pending(self, session_id: str) -> Optional[dict]:
+        """Unflushed patch for a session, to overlay on what the database returns."""
+        return await self.store.peek(session_id)
+
+    async def discard(self, session_id: str) -> None:
+        """Drop pending state for a session that is being deleted."""
+        await self.store.take([session_id])
+
+    async def flush(self, session_ids: Optional[Iterable[str]] = None) -> int:
+        """Write pending patches, one transaction per session; return how many were written.
+
+        A session that fails keeps its patch for the next flush without holding
+        back the others, and the first such error is re-raised once the batch
+        is done. Patches for sessions that no longer exist are dropped.
+        """
+        batch = await self.store.take(session_ids)
+        unwritten = dict(batch)
+        errors = []
+        written = 0
+        try:
+            async with SessionLocal() as db:
+                for session_id, patch in batch.items():
+                    try:
+                        version = await persist_progress(db, session_id, patch)
+                        await db.commit()
+                    except Exception as exc:
+                        await db.rollback()
+                        logger.warning("Autosave flush failed for session %s: %s", session_id, exc)
+                        errors.append(exc)
+                        continue
+                    del unwritten[session_id]
+                    if version is None:
+                        logger.info("Dropped autosave for missing session %s", session_id)
+                    else:
+                        written += 1
+        finally:
+            for session_id, patch in unwritten.items():
+                await self.store.restore(session_id, patch)
+        if errors:
+            raise errors[0]
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Autosave flush failed; pending snapshots kept for retry")
+
+    async def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the flusher and persist everything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        finally:
+            await self.store.close()
+
+
+_buffer: Optional[AutosaveBuffer] = None
+
+
+def get_autosave_buffer() -> AutosaveBuffer:
+    """Return the process-wide autosave buffer built from settings."""
+    global _buffer
+    if _buffer is None:
+        settings = get_settings()
+        if settings.autosave_backend == "redis":
+            store = RedisAutosaveStore(settings.redis_url)
+        else:
+            store = MemoryAutosaveStore()
+        _buffer = AutosaveBuffer(store, settings.autosave_flush_interval_seconds)
+    return _buffer
@@ -0,0 +1,221 @@
+"""Content-addressed cache for code execution and validation results.
+
+Candidates press "Run" repeatedly on unchanged code, and the editor validates
+the same source on every debounce. Results are keyed by a SHA-256 over the
+language, source, test cases and runner version, so a hit is safe to serve
+without touching a sandbox worker.
+
+Two tiers are supported: a bounded in-process LRU (always on) and an optional
+Redis tier shared by every API worker. The Redis tier is best-effort; any error
+talking to it is logged and treated as a miss.
+"""
+
+import ast
+import functools
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Optional
+
+from ..config import get_settings
+from .sandbox import WORKER_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+
+def _runner_version() -> str:
+    """Fingerprint the worker script so any runner change invalidates old entries."""
+    with open(WORKER_SCRIPT, "rb") as script:
+        return hashlib.sha256(script.read()).hexdigest()[:12]
+
+
+RUNNER_VERSION = _runner_version()
+
+# Programs touching these modules may legitimately print something different
+# on every run, so their results are never cached.
+_NONDETERMINISTIC_MODULES = frozenset(
+    {
+        "random", "time", "datetime", "uuid", "secrets", "os", "threading",
+        "multiprocessing", "asyncio", "socket", "urllib", "http", "subprocess",
+        "importlib", "builtins", "ctypes", "gc", "tracemalloc", "sys", "io",
+        "pathlib", "tempfile", "shutil", "glob", "fileinput", "platform",
+        "resource", "signal", "select", "mmap", "getpass", "locale",
+    }
+)
+# Calls whose result depends on object addresses or the environment, or that
+# can import modules by a name the checker cannot see.
+_NONDETERMINISTIC_CALLS = frozenset(
+    {
+        "__import__", "id", "hash", "eval", "exec", "compile", "open", "input",
+        "object", "breakpoint",
+    }
+)
+# Calls that render their arguments; a lambda passed straight to one prints its
+# address.
+_RENDERING_CALLS = frozenset({"print", "repr", "str", "format", "ascii"})
+# Attribute or name lookups that reach modules without an import statement.
+_ESCAPE_NAMES = frozenset({"modules", "__builtins__", "__subclasses__", "__globals__", "__loader__"})
+# The default repr of functions, classes and instances, e.g.
+# ``<function <lambda> at 0x7f...>`` or ``<__main__.A object at 0x7f...>``.
+_OBJECT_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+>")
+
+
+@functools.lru_cache(maxsize=1024)
+def is_deterministic(code: str) -> bool:
+    """Whether a program's output can only depend on its source.
+
+    Walks the syntax tree for imports of non-deterministic modules (under any
+    alias), calls to ``__import__``/``id``/``hash``/``eval``/``open``/
+    ``object``, lambdas rendered directly and lookups such as
+    ``__builtins__``. Reprs that embed an address can still come from objects
+    the checker cannot see, so callers also check the output with
+    :func:`shows_addresses` before caching it. Workers run with a fixed ``PYTHONHASHSEED`` so set and
+    dict ordering of strings is stable between runs. Code that does not parse
+    fails the same way every time and is deterministic.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return True
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules = [node.module or ""]
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            if node.func.id in _NONDETERMINISTIC_CALLS:
+                return False
+            if node.func.id in _RENDERING_CALLS and any(
+                isinstance(arg, ast.Lambda) for arg in node.args
+            ):
+                return False
+            continue
+        elif isinstance(node, ast.FormattedValue):
+            if isinstance(node.value, ast.Lambda):
+                return False
+            continue
+        elif isinstance(node, ast.Attribute):
+            if node.attr in _ESCAPE_NAMES:
+                return False
+            continue
+        elif isinstance(node, ast.Name):
+            if node.id in _ESCAPE_NAMES or node.id == "__import__":
+                return False
+            continue
+        else:
+            continue
+        if any(module.split(".")[0] in _NONDETERMINISTIC_MODULES for module in modules):
+            return False
+    return True
+
+
+def shows_addresses(output: str) -> bool:
+    """Whether output contains a default object repr, which changes every run."""
+    return _OBJECT_ADDRESS.search(output) is not None
+
+
+def cache_key(kind: str, **parts: Any) -> str:
+    """Hash the request parts together with the runner version."""
+    material = json.dumps(
+        {"kind": kind, "runner": RUNNER_VERSION, **parts},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return f"codecache:{kind}:{hashlib.sha256(material.encode()).hexdigest()}"
+
+
+class LRUCache:
+    """In-process LRU bounded by both entry count and total payload bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size_bytes -= len(previous)
+        self._entries[key] = value
+        self.size_bytes += len(value)
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= len(evicted)
+
+
+class ExecutionCache:
+    """Two-tier cache: local LRU in front of an optional shared Redis tier."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: int,
+        redis_url: Optional[str] = None,
+    ):
+        self.local = LRUCache(max_entries, max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self._redis = None
+        if redis_url:
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                logger.warning("redis package not installed; shared code cache disabled")
+            else:
+                self._redis = redis.from_url(redis_url)
+
+    async def get(self, key: str, shared: bool = True) -> Optional[dict]:
+        value = self.local.get(key)
+        if value is None and shared and self._redis is not None:
+            try:
+                value = await self._redis.get(key)
+            except Exception:
+                logger.warning("Shared code cache read failed", exc_info=True)
+                value = None
+            if value is not None:
+                self.local.set(key, value)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, result: dict, shared: bool = True) -> None:
+        value = json.dumps(result, separators=(",", ":")).encode()
+        self.local.set(key, value)
+        if shared and self._redis is not None:
+            try:
+                await self._redis.set(key, value, ex=self.ttl_seconds)
+            except Exception:
+                logger.warning("Shared code cache write failed", exc_info=True)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+_cache: Optional[ExecutionCache] = None
+
+
+def get_execution_cache() -> ExecutionCache:
+    """Return the process-wide execution cache built from settings."""
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = ExecutionCache(
+            max_entries=settings.code_cache_max_entries,
+            max_bytes=settings.code_cache_max_bytes,
+            ttl_seconds=settings.code_cache_ttl_seconds,
+            redis_url=settings.redis_url if settings.code_cache_shared else None,
+        )
+    return _cache
@@ -0,0 +1,119 @@
+"""Local stand-in for an OpenAI-compatible chat completions API.
+
+Lets the interviewer LLM path run offline and under load tests without
+spending tokens. Latency and failures are tunable through environment
+variables so time-to-first-token and retry behavior can be exercised:
+
+* ``FAKE_LLM_FIRST_TOKEN_MS``: delay before the first token (default 150)
+* ``FAKE_LLM_TOKEN_MS``: delay between later tokens (default 15)
+* ``FAKE_LLM_FAILURE_RATE``: fraction of requests answered with a 503 (default 0)
+
+Run it with ``uvicorn app.services.fake_llm:app --port 8001`` and set
+``LLM_PROVIDER=openai`` and ``LLM_BASE_URL=http://localhost:8001/v1``.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from typing import AsyncIterator, Dict, List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+
+class ChatMessage(BaseModel):
+    role: str
+    content: str
+
+
+class ChatCompletionRequest(BaseModel):
+    model: str = "fake-interviewer"
+    messages: List[ChatMessage]
+    stream: bool = False
+
+
+def _reply_for(messages: List[ChatMessage]) -> str:
+    last = messages[-1].content if messages else ""
+    topic = " ".join(last.split()[:8]) or "your approach"
+    return (
+        f"Interesting. You mentioned {topic!r}. What is the time and space complexity, "
+        f"and which edge cases would you test first?"
+    )
+
+
+def create_fake_llm_app(
+    first_token_ms: float = 150.0,
+    token_ms: float = 15.0,
+    failure_rate: float = 0.0,
+) -> FastAPI:
+    """Build a fake chat completions server with the given latency profile."""
+    app = FastAPI(title="Fake LLM")
+
+    async def stream(completion_id: str, model: str, tokens: List[str]) -> AsyncIterator[bytes]:
+        await asyncio.sleep(first_token_ms / 1000)
+        for index, token in enumerate(tokens):
+            if index:
+                await asyncio.sleep(token_ms / 1000)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        done = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        yield f"data: {json.dumps(done)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    @app.get("/v1/models")
+    def list_models() -> Dict:
+        return {"object": "list", "data": [{"id": "fake-interviewer", "object": "model"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: ChatCompletionRequest):
+        if failure_rate and random.random() < failure_rate:
+            return JSONResponse({"error": {"message": "fake overload"}}, status_code=503)
+
+        reply = _reply_for(request.messages)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        if request.stream:
+            tokens = [word + " " for word in reply.split(" ")]
+            return StreamingResponse(
+                stream(completion_id, request.model, tokens),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(first_token_ms / 1000)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop",
+                }
+            ],
+        }
+
+    return app
+
+
+app = create_fake_llm_app(
+    first_token_ms=float(os.getenv("FAKE_LLM_FIRST_TOKEN_MS", "150")),
+    token_ms=float(os.getenv("FAKE_LLM_TOKEN_MS", "15")),
+    failure_rate=float(os.getenv("FAKE_LLM_FAILURE_RATE", "0")),
+)
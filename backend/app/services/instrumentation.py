@@ -0,0 +1,124 @@
+"""Request latency and event-loop lag metrics.
+
+``RequestMetricsMiddleware`` is a plain ASGI middleware rather than a
+``BaseHTTPMiddleware``: it adds no task or body buffering per request, only
+two clock reads, a counter bump and one histogram observation through an
+observer cached per (method, route, status). Requests are labelled by route
+template (``/api/sessions/{session_id}``), never the raw path, so the number
+of series stays bounded; unmatched paths share one label, as do methods outside
+the standard set.
+Streaming responses are timed until the last body chunk is sent.
+
+``EventLoopLagMonitor`` sleeps for a fixed interval and records how late it
+wakes up. Sustained lag means something is blocking the loop (synchronous
+I/O, heavy CPU work in a handler), which delays every in-flight request.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from ..config import get_settings
+from . import metrics
+
+REQUEST_SECONDS = metrics.registry.histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request by method, route template and status",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = metrics.registry.gauge(
+    "http_requests_in_flight", "Requests currently being served"
+)
+LOOP_LAG_SECONDS = metrics.registry.histogram(
+    "event_loop_lag_seconds", "How late the event loop woke a sleeping sampler"
+)
+LOOP_LAG_LAST = metrics.registry.gauge(
+    "event_loop_lag_last_seconds", "Most recent event loop lag sample"
+)
+
+UNMATCHED_ROUTE = "unmatched"
+OTHER_METHOD = "OTHER"
+KNOWN_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
+
+
+class RequestMetricsMiddleware:
+    """Records per-route latency and in-flight requests for HTTP traffic."""
+
+    def __init__(self, app):
+        self.app = app
+        self.in_flight = 0
+        # (method, route, status) -> bound histogram observer
+        self._observers = {}
+        REQUESTS_IN_FLIGHT.set_function(lambda: self.in_flight)
+
+    def _observer(self, key):
+        observer = self._observers.get(key)
+        if observer is None:
+            method, route, status = key
+            observer = self._observers[key] = REQUEST_SECONDS.labels(method, route, str(status))
+        return observer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.in_flight -= 1
+            route = scope.get("route")
+            method = scope["method"] if scope["method"] in KNOWN_METHODS else OTHER_METHOD
+            self._observer((method, getattr(route, "path", UNMATCHED_ROUTE), status))(elapsed)
+
+
+class EventLoopLagMonitor:
+    """Samples event loop scheduling delay every ``interval`` seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            LOOP_LAG_SECONDS.observe(lag)
+            LOOP_LAG_LAST.set(lag)
+
+    async def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_monitor: Optional[EventLoopLagMonitor] = None
+
+
+def get_loop_lag_monitor() -> EventLoopLagMonitor:
+    """Return the process-wide event loop lag sampler built from settings."""
+    global _monitor
+    if _monitor is None:
+        _monitor = EventLoopLagMonitor(get_settings().event_loop_lag_interval_seconds)
+    return _monitor
@@ -0,0 +1,382 @@
+"""Background jobs for work that should not hold an HTTP request open.
+
+Ending an interview produces feedback, which will grow into test re-runs,
+model rubric passes and complexity analysis. Endpoints ``submit`` a job and
+return its ID straight away; a fixed pool of worker tasks consumes the queue,
+so a burst of finished interviews queues up instead of competing with
+interactive requests. Clients poll ``GET /api/jobs/{id}`` (optionally
+long-polling with ``?wait=``) for the result.
+
+* Concurrency is bounded by ``job_concurrency`` workers per process.
+* A handler that raises is retried with jittered exponential backoff until
+  ``job_max_attempts`` is reached, then the job is marked failed. Raising
+  :class:`PermanentJobError` fails the job straight away.
+* A handler that runs past ``job_visibility_timeout_seconds`` is cancelled
+  and counts as a failed attempt. With the Redis queue a claimed job also
+  holds a lease ``LEASE_GRACE_SECONDS`` longer than that, so a job is only
+  reclaimed once its worker is gone, never while it is still finishing or
+  being cancelled. If the worker process dies, the job becomes visible again
+  and another worker picks it up, so handlers must be safe to run twice.
+
+Handlers are registered by kind with ``@job_handler("kind")``; they receive
+the JSON payload and return a JSON-serializable result. The in-memory queue
+is per process; use the Redis queue when several API workers serve the same
+clients.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..config import get_settings
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+JOBS = metrics.registry.counter("jobs_total", "Background jobs by kind and outcome", ("kind", "outcome"))
+JOB_SECONDS = metrics.registry.histogram(
+    "job_duration_seconds", "Time a job handler ran, per attempt", ("kind",)
+)
+JOB_QUEUE_SECONDS = metrics.registry.histogram(
+    "job_queue_wait_seconds", "Time from submission to the first attempt starting", ("kind",)
+)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+_handlers: Dict[str, Handler] = {}
+
+TERMINAL = ("succeeded", "failed")
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for a failure that retrying cannot fix."""
+
+
+def job_handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register the coroutine that runs jobs of ``kind``."""
+
+    def register(handler: Handler) -> Handler:
+        _handlers[kind] = handler
+        return handler
+
+    return register
+
+
+@dataclass
+class Job:
+    """A unit of background work and, once finished, its result."""
+
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: str = "queued"  # queued, running, succeeded, failed
+    attempts: int = 0
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"), default=str)
+
+    @classmethod
+    def from_json(cls, raw) -> "Job":
+        return cls(**json.loads(raw))
+
+
+class MemoryJobQueue:
+    """Jobs held in this process; lost on restart."""
+
+    def __init__(self, result_ttl_seconds: int):
+        self.result_ttl_seconds = result_ttl_seconds
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._ready: "asyncio.Queue[str]" = asyncio.Queue()
+        self._changed: Dict[str, asyncio.Event] = {}
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.result_ttl_seconds
+        while self._jobs:
+            oldest = next(iter(self._jobs.values()))
+            if not oldest.done or oldest.finished_at > cutoff:
+                return
+            self._jobs.popitem(last=False)
+            self._changed.pop(oldest.id, None)
+
+    async def enqueue(self, job: Job) -> None:
+        self._prune()
+        self._jobs[job.id] = job
+        self._ready.put_nowait(job.id)
+
+    async def claim(self, timeout: float, lease_seconds: float) -> Optional[Job]:
+        try:
+            job_id = await asyncio.wait_for(self._ready.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.status = "running"
+        job.attempts += 1
+        return job
+
+    async def retry(self, job: Job, delay: float) -> None:
+        job.status = "queued"
+        asyncio.get_running_loop().call_later(delay, self._ready.put_nowait, job.id)
+
+    async def finish(self, job: Job) -> None:
+        job.finished_at = time.time()
+        # Keep the OrderedDict in completion order so pruning stops early.
+        self._jobs.move_to_end(job.id)
+        event = self._changed.pop(job.id, None)
+        if event is not None:
+            event.set()
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return job
+        event = self._changed.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._jobs.get(job_id)
+
+    async def close(self) -> None:
+        pass
+
+
+# Moves due retries and expired leases back onto the ready list, then claims
+# one job and leases it, atomically so two workers never claim the same job.
+_CLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+for _, source in ipairs({KEYS[3], KEYS[2]}) do
+    local due = redis.call('ZRANGEBYSCORE', source, '-inf', now)
+    for _, id in ipairs(due) do
+        redis.call('ZREM', source, id)
+        redis.call('LPUSH', KEYS[1], id)
+    end
+end
+local id = redis.call('RPOP', KEYS[1])
+if id then
+    redis.call('ZADD', KEYS[2], now + tonumber(ARGV[2]), id)
+end
+return id
+"""
+
+
+class RedisJobQueue:
+    """Jobs shared by every API worker through Redis.
+
+    ``jobs:ready`` is a list of job IDs, ``jobs:leases`` and ``jobs:delayed``
+    are sorted sets scored by lease expiry and retry time, and each job is a
+    JSON string that expires ``result_ttl_seconds`` after its last update.
+    Redis has no blocking pop for this, so idle workers poll ``claim``.
+    """
+
+    READY_KEY = "jobs:ready"
+    LEASES_KEY = "jobs:leases"
+    DELAYED_KEY = "jobs:delayed"
+    POLL_SECONDS = 0.25
+
+    def __init__(self, redis_url: str, result_ttl_seconds: int):
+        import redis.asyncio as redis
+
+        self.result_ttl_seconds = result_ttl_seconds
+        self._redis = redis.from_url(redis_url)
+        self._claim = self._redis.register_script(_CLAIM_SCRIPT)
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"jobs:job:{job_id}"
+
+    async def enqueue(self, job: Job) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(job.id), job.to_json(), ex=self.result_ttl_seconds)
+            pipe.lpush(self.READY_KEY, job.id)
+            await pipe.execute()
+
+    async def claim(self, timeout: float, lease_seconds: float) -> Optional[Job]:
+        deadline = time.monotonic() + timeout
+        while True:
+            job_id = await self._claim(
+                keys=[self.READY_KEY, self.LEASES_KEY, self.DELAYED_KEY],
+                args=[time.time(), lease_seconds],
+            )
+            if job_id is not None:
+                raw = await self._redis.get(self._key(job_id.decode()))
+                if raw is None:
+                    await self._redis.zrem(self.LEASES_KEY, job_id)
+                    continue
+                job = Job.from_json(raw)
+                job.status = "running"
+                job.attempts += 1
+                await self._redis.set(self._key(job.id), job.to_json(), ex=self.result_ttl_seconds)
+                return job
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.POLL_SECONDS)
+
+    async def retry(self, job: Job, delay: float) -> None:
+        job.status = "queued"
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(job.id), job.to_json(), ex=self.result_ttl_seconds)
+            pipe.zrem(self.LEASES_KEY, job.id)
+            pipe.zadd(self.DELAYED_KEY, {job.id: time.time() + delay})
+            await pipe.execute()
+
+    async def finish(self, job: Job) -> None:
+        job.finished_at = time.time()
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(job.id), job.to_json(), ex=self.result_ttl_seconds)
+            pipe.zrem(self.LEASES_KEY, job.id)
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        raw = await self._redis.get(self._key(job_id))
+        return Job.from_json(raw) if raw is not None else None
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.get(job_id)
+            if job is None or job.done or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(self.POLL_SECONDS)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class JobWorkerPool:
+    """Submits jobs and runs them on a fixed number of worker tasks."""
+
+    # How long an idle worker waits for work before checking again.
+    CLAIM_TIMEOUT = 1.0
+    # Lease time on top of the handler timeout, covering cancellation and the
+    # bookkeeping after it.
+    LEASE_GRACE_SECONDS = 30.0
+
+    def __init__(self, queue, concurrency: int, max_attempts: int, visibility_timeout: float):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.visibility_timeout = visibility_timeout
+        self._workers: List[asyncio.Task] = []
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        if kind not in _handlers:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        job = Job(id=uuid.uuid4().hex, kind=kind, payload=payload)
+        await self.queue.enqueue(job)
+        JOBS.inc(kind, "submitted")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.queue.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """The job once it finishes, or as it stands after ``timeout`` seconds."""
+        return await self.queue.wait(job_id, timeout)
+
+    async def _fail(self, job: Job, error: str) -> None:
+        job.status = "failed"
+        job.error = error
+        await self.queue.finish(job)
+        JOBS.inc(job.kind, "failed")
+
+    async def _execute(self, job: Job) -> None:
+        handler = _handlers.get(job.kind)
+        if handler is None:
+            await self._fail(job, f"No handler registered for job kind {job.kind!r}")
+            return
+        if job.attempts > self.max_attempts:
+            # Claimed again after its lease expired on the last attempt.
+            await self._fail(job, job.error or "Worker lost while running the job")
+            return
+        if job.attempts == 1:
+            JOB_QUEUE_SECONDS.observe(time.time() - job.created_at, job.kind)
+
+        started = time.perf_counter()
+        try:
+            job.result = await asyncio.wait_for(handler(job.payload), self.visibility_timeout)
+        except Exception as exc:
+            job.error = str(exc) or type(exc).__name__
+            if isinstance(exc, asyncio.TimeoutError):
+                job.error = f"Timed out after {self.visibility_timeout:g}s"
+            if isinstance(exc, PermanentJobError):
+                logger.warning("Job %s (%s) failed permanently: %s", job.id, job.kind, job.error)
+                await self._fail(job, job.error)
+            elif job.attempts >= self.max_attempts:
+                logger.exception("Job %s (%s) failed after %d attempts", job.id, job.kind, job.attempts)
+                await self._fail(job, job.error)
+            else:
+                logger.warning("Job %s (%s) attempt %d failed: %s", job.id, job.kind, job.attempts, job.error)
+                JOBS.inc(job.kind, "retried")
+                await self.queue.retry(job, random.uniform(0, min(30.0, 2.0 ** job.attempts)))
+        else:
+            job.status = "succeeded"
+            job.error = None
+            await self.queue.finish(job)
+            JOBS.inc(job.kind, "succeeded")
+        finally:
+            JOB_SECONDS.observe(time.perf_counter() - started, job.kind)
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                job = await self.queue.claim(
+                    self.CLAIM_TIMEOUT, self.visibility_timeout + self.LEASE_GRACE_SECONDS
+                )
+                if job is not None:
+                    await self._execute(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job worker error")
+                await asyncio.sleep(self.CLAIM_TIMEOUT)
+
+    async def start(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def close(self) -> None:
+        """Stop the workers; jobs still running are retried by the next process (Redis only)."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self.queue.close()
+
+
+_pool: Optional[JobWorkerPool] = None
+
+
+def get_job_pool() -> JobWorkerPool:
+    """Return the process-wide job pool built from settings."""
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        if settings.job_backend == "redis":
+            queue = RedisJobQueue(settings.redis_url, settings.job_result_ttl_seconds)
+        else:
+            queue = MemoryJobQueue(settings.job_result_ttl_seconds)
+        _pool = JobWorkerPool(
+            queue,
+            concurrency=settings.job_concurrency,
+            max_attempts=settings.job_max_attempts,
+            visibility_timeout=settings.job_visibility_timeout_seconds,
+        )
+    return _pool
@@ -0,0 +1,241 @@
+"""Async client for OpenAI-compatible chat completion APIs.
+
+The interviewer's perceived latency is time to first token, not time to the
+full completion, so replies are always streamed and the client is built
+around getting the first token out quickly:
+
+* one pooled ``httpx.AsyncClient`` (HTTP/2 when the ``h2`` extra is
+  installed) keeps connections warm across requests;
+* a semaphore caps concurrent upstream calls so a burst of candidates queues
+  locally instead of tripping provider rate limits;
+* connect errors, 429s and 5xx responses are retried with exponentially
+  growing, fully jittered backoff, but only until the first token has been
+  forwarded; a stream that fails midway is surfaced, never replayed;
+* a first-token deadline bounds how long a stalled upstream can keep a
+  candidate waiting before the attempt is retried.
+
+``app/services/fake_llm.py`` serves the same protocol locally for offline
+development and load testing.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from ..config import get_settings
+from . import metrics
+from .llm_cache import LLMResponseCache, get_llm_cache, semantic_key
+from .mock_ai import MockInterviewEngine
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+REQUESTS = metrics.registry.counter(
+    "llm_requests_total", "Interviewer LLM calls by outcome", ("outcome",)
+)
+RETRIES = metrics.registry.counter("llm_retries_total", "Interviewer LLM attempts that were retried")
+FIRST_TOKEN_SECONDS = metrics.registry.histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from request to the first streamed token, including queueing and retries",
+)
+COMPLETION_SECONDS = metrics.registry.histogram(
+    "llm_completion_seconds", "Time from request to the end of the streamed reply"
+)
+
+
+class LLMError(Exception):
+    """The upstream model could not produce a reply."""
+
+
+class _Retryable(Exception):
+    pass
+
+
+class LLMClient:
+    """Streaming chat completions with pooling, retries and a concurrency cap."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        model: str,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        first_token_timeout: float = 10.0,
+        max_retries: int = 2,
+        max_concurrency: int = 16,
+        http2: bool = True,
+    ):
+        self.model = model
+        self.first_token_timeout = first_token_timeout
+        self.max_retries = max_retries
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("h2 package not installed; LLM client falling back to HTTP/1.1")
+                http2 = False
+
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            http2=http2,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+        )
+
+    async def _backoff(self, attempt: int) -> None:
+        RETRIES.inc()
+        await asyncio.sleep(random.uniform(0, min(4.0, 0.25 * 2 ** attempt)))
+
+    @staticmethod
+    async def _tokens(response: httpx.Response) -> AsyncIterator[str]:
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                return
+            try:
+                choices = json.loads(data).get("choices") or [{}]
+                content = (choices[0].get("delta") or {}).get("content")
+            except (ValueError, AttributeError, IndexError, TypeError, KeyError) as exc:
+                raise LLMError(f"malformed stream chunk: {data[:200]}") from exc
+            if content:
+                yield content
+
+    async def _attempt(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        async with self._client.stream("POST", "/chat/completions", json=payload) as response:
+            if response.status_code in RETRYABLE_STATUS:
+                raise _Retryable(f"upstream returned {response.status_code}")
+            if response.status_code >= 400:
+                body = (await response.aread())[:500].decode(errors="replace")
+                raise LLMError(f"upstream returned {response.status_code}: {body}")
+
+            tokens = self._tokens(response)
+            try:
+                first = await asyncio.wait_for(anext(tokens), self.first_token_timeout)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                raise _Retryable("no first token before deadline")
+            yield first
+            async for token in tokens:
+                yield token
+
+    async def stream_chat(self, messages: List[Dict[str, str]], **params: Any) -> AsyncIterator[str]:
+        """Yield reply tokens as the model produces them."""
+        payload = {"model": self.model, "messages": messages, "stream": True, **params}
+        started = time.perf_counter()
+        forwarded = False
+        outcome = "error"
+        try:
+            async with self._slots:
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        async for token in self._attempt(payload):
+                            if not forwarded:
+                                forwarded = True
+                                FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+                            yield token
+                        outcome = "success"
+                        return
+                    except (_Retryable, httpx.TransportError) as exc:
+                        if forwarded or attempt == self.max_retries:
+                            raise LLMError(str(exc) or type(exc).__name__) from exc
+                        logger.info("Retrying LLM call after attempt %d: %s", attempt + 1, exc)
+                        await self._backoff(attempt)
+        finally:
+            REQUESTS.inc(outcome)
+            COMPLETION_SECONDS.observe(time.perf_counter() - started)
+
+    async def complete(self, messages: List[Dict[str, str]], **params: Any) -> str:
+        """Whole reply as one string (still streamed from upstream)."""
+        return "".join([token async for token in self.stream_chat(messages, **params)])
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+@dataclass
+class LLMInterviewEngine(MockInterviewEngine):
+    """Interview engine whose interviewer replies come from a real model.
+
+    Replies go through the response cache, so identical turns are replayed or
+    coalesced onto one upstream call. Prompts and feedback are still produced
+    by the mock heuristics.
+    """
+
+    client: Optional[LLMClient] = None
+    cache: Optional[LLMResponseCache] = None
+
+    def build_messages(self, session, message: str) -> List[Dict[str, str]]:
+        request = session.request
+        questions = "\n".join(f"- {prompt.title}: {prompt.body}" for prompt in session.prompts)
+        system = (
+            f"You are a {request.target_company} interviewer running a mock interview "
+            f"for a {request.experience_level} {request.focus_area} candidate. "
+            f"Stay in character, ask one question at a time and keep replies short.\n"
+            f"Planned questions:\n{questions}"
+        )
+        return [{"role": "system", "content": system}, {"role": "user", "content": message}]
+
+    async def stream_reply(self, session, message: str) -> AsyncIterator[str]:
+        messages = self.build_messages(session, message)
+        if self.cache is None:
+            async for token in self.client.stream_chat(messages):
+                yield token
+            return
+
+        key = semantic_key(self.client.model, messages)
+        async for token in self.cache.stream(key, lambda: self.client.stream_chat(messages)):
+            yield token
+
+
+_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """Return the process-wide LLM client built from settings."""
+    global _client
+    if _client is None:
+        settings = get_settings()
+        _client = LLMClient(
+            base_url=settings.llm_base_url,
+            api_key=settings.openai_api_key,
+            model=settings.llm_model,
+            timeout=settings.llm_timeout_seconds,
+            connect_timeout=settings.llm_connect_timeout_seconds,
+            first_token_timeout=settings.llm_first_token_timeout_seconds,
+            max_retries=settings.llm_max_retries,
+            max_concurrency=settings.llm_max_concurrency,
+            http2=settings.llm_http2,
+        )
+    return _client
+
+
+async def close_llm_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def get_interview_engine() -> MockInterviewEngine:
+    """The engine selected by ``llm_provider``: scripted mock or a real model."""
+    if get_settings().llm_provider == "openai":
+        return LLMInterviewEngine(client=get_llm_client(), cache=get_llm_cache())
+    return MockInterviewEngine()
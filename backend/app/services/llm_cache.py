@@ -0,0 +1,156 @@
+"""Response cache and request coalescing for interviewer LLM calls.
+
+Candidates with the same company/level profile get the same system prompt,
+and a double-clicked "send" repeats the same turn. Requests are keyed by a
+normalized form of the conversation (model, roles, whitespace-collapsed and
+case-folded text), so trivially different spellings of one request share an
+entry.
+
+* Completed replies are kept in a TTL-bounded LRU and replayed on a hit.
+* Identical requests that arrive while one is already running join it
+  (single-flight): one upstream call is made and every caller receives its
+  tokens as they stream in. The upstream call runs in its own task, so a
+  caller disconnecting does not cut off the others.
+
+Hit, miss and coalesced counts are exported for hit-rate dashboards.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from ..config import get_settings
+from . import metrics
+
+CACHE_REQUESTS = metrics.registry.counter(
+    "llm_cache_requests_total",
+    "Interviewer LLM requests by cache result (hit, miss, coalesced)",
+    ("result",),
+)
+
+
+def semantic_key(model: str, messages: List[Dict[str, str]]) -> str:
+    """Key requests that differ only in case or whitespace identically."""
+    normalized = [
+        (message["role"], " ".join(message["content"].split()).casefold())
+        for message in messages
+    ]
+    material = json.dumps([model, normalized], separators=(",", ":"))
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class _Flight:
+    """One upstream call shared by every caller with the same key."""
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+
+    def publish(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[str]:
+        index = 0
+        while True:
+            changed = self.changed
+            while index < len(self.tokens):
+                yield self.tokens[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await changed.wait()
+
+
+class LLMResponseCache:
+    """TTL + LRU cache of completed replies with single-flight streaming."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._tasks: set = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _drive(self, key: str, flight: _Flight, produce: Callable[[], AsyncIterator[str]]):
+        try:
+            async for token in produce():
+                flight.tokens.append(token)
+                flight.publish()
+        except asyncio.CancelledError as exc:
+            flight.error = exc
+            raise
+        except Exception as exc:
+            flight.error = exc
+        else:
+            # An empty reply is a failed generation, not an answer worth caching.
+            if flight.tokens:
+                self.set(key, "".join(flight.tokens))
+        finally:
+            flight.done = True
+            self._flights.pop(key, None)
+            flight.publish()
+
+    async def stream(
+        self, key: str, produce: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """Yield the reply for ``key``, from cache, a running flight, or ``produce()``."""
+        cached = self.get(key)
+        if cached is not None:
+            CACHE_REQUESTS.inc("hit")
+            yield cached
+            return
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            CACHE_REQUESTS.inc("coalesced")
+        else:
+            CACHE_REQUESTS.inc("miss")
+            flight = self._flights[key] = _Flight()
+            task = asyncio.create_task(self._drive(key, flight, produce))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        async for token in flight.follow():
+            yield token
+
+
+_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Return the process-wide interviewer response cache built from settings."""
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = LLMResponseCache(settings.llm_cache_max_entries, settings.llm_cache_ttl_seconds)
+    return _cache
@@ -5,21 +5,15 @@ this module fabricates prompts and feedback using deterministic heuristics so
 the frontend can integrate before AI access is wired up.
 """
 
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 
-
-class InterviewPrompt(BaseModel):
-    """A single interviewer instruction."""
-
-    id: str
-    type: str = Field(..., description="coding|behavioral|followup")
-    title: str
-    body: str
-    expected_duration: int = Field(5, description="Minutes suggested for prompt")
+from .prompt_catalog import InterviewPrompt, get_prompt_catalog
+from .scoring import ScoreAccumulator
 
 
 class InterviewFeedback(BaseModel):
@@ -46,45 +40,45 @@ class MockInterviewEngine:
     )
 
     def generate_prompts(self, request) -> List[InterviewPrompt]:
-        """Return canned prompts tailored by company/experience level."""
-        company = request.target_company
-        experience = request.experience_level.capitalize()
-        return [
-            InterviewPrompt(
-                id="coding-array",
-                type="coding",
-                title=f"{company} {experience} Coding Warmup",
-                body="Implement a rate limiter that allows N requests per rolling minute.",
-                expected_duration=20,
-            ),
-            InterviewPrompt(
-                id="systems-design",
-                type="discussion",
-                title="Systems follow-up",
-                body="Sketch how you would extend the service to support bursty traffic.",
-                expected_duration=15,
-            ),
-            InterviewPrompt(
-                id="behavioral",
-                type="behavioral",
-                title="Behavioral reflection",
-                body="Tell me about a production incident you owned end-to-end.",
-                expected_duration=10,
-            ),
-        ]
+        """Return catalog prompts tailored by company/experience level/focus."""
+        prompt_set = get_prompt_catalog().prompts_for(
+            request.target_company,
+            request.experience_level,
+            request.focus_area,
+        )
+        return list(prompt_set.prompts)
+
+    async def stream_reply(self, session, message: str) -> AsyncIterator[str]:
+        """Yield a scripted interviewer reply word by word, like a streamed model."""
+        reply = (
+            f"Thanks. Before we go further, how would that approach hold up at "
+            f"{session.request.target_company} scale, and what is its time complexity?"
+        )
+        for word in reply.split(" "):
+            await asyncio.sleep(0)
+            yield word + " "
 
     def generate_feedback(self, session, transcript) -> InterviewFeedback:
         """Craft a summary informed by transcript length."""
-        touches = len(transcript)
-        complexity_callout = next(
-            (
-                e.payload.get("analysis")
-                for e in transcript
-                if e.payload.get("analysis")
-            ),
-            "Complexity discussion captured basic Big-O detail.",
+        return self.finalize_feedback(session, ScoreAccumulator().extend(transcript))
+
+    def finalize_feedback(self, session, scores: ScoreAccumulator) -> InterviewFeedback:
+        """Turn precomputed transcript aggregates into feedback in O(1)."""
+        touches = scores.touches
+        complexity_callout = (
+            scores.analysis[0]
+            if scores.analysis
+            else "Complexity discussion captured basic Big-O detail."
         )
 
+        code_run_notes = []
+        if scores.pass_rate is not None:
+            code_run_notes.append(
+                f"Code runs: {scores.tests_passed}/{scores.tests_total} tests passing "
+                f"across {scores.code_runs} runs."
+            )
+        strong_runs = scores.pass_rate is not None and scores.pass_rate >= 0.5
+
         score = min(5.0, 3.5 + touches * 0.1)
         now = datetime.utcnow().strftime("%b %d %H:%M UTC")
 
@@ -95,9 +89,11 @@ class MockInterviewEngine:
                 f" Candidate strengths centered on clarity and resilience."
             ),
             strengths=list(self.default_strengths)
-            + [f"Transcript depth: {touches} notable events."],
+            + [f"Transcript depth: {touches} notable events."]
+            + (code_run_notes if strong_runs else []),
             improvements=list(self.default_improvements)
-            + [complexity_callout],
+            + [complexity_callout]
+            + ([] if strong_runs else code_run_notes),
             recommended_next_steps=[
                 "Redo the warmup question after 48 hours.",
                 "Schedule a behavioral-only loop for deeper STAR practice.",
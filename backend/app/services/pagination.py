@@ -0,0 +1,28 @@
+"""Opaque keyset cursors for listing endpoints.
+
+Offset pagination makes the database walk and discard every earlier row, so
+deep pages get slower as history grows. A cursor records the sort key of the
+last row served, ``(started_at, id)``, and the next page resumes with a range
+condition the index answers directly: page N costs the same as page 1.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(started_at: datetime, row_id: int) -> str:
+    """Pack a row's sort key into a URL-safe token."""
+    raw = json.dumps([started_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    """Unpack a token from ``encode_cursor``; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        started_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(started_at), int(row_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("malformed cursor") from exc
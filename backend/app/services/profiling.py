@@ -0,0 +1,308 @@
+"""Opt-in sampling profiler for individual production requests.
+
+When ``profiling_enabled`` is set, ``ProfilingMiddleware`` profiles a random
+``profiling_sample_rate`` fraction of requests, plus any request carrying the
+``profiling_header`` with a value equal to ``profiling_token``. Without a
+token the header is ignored, so clients cannot force the expensive path. With profiling disabled the middleware is not installed and no
+SQL listeners are registered, so there is no per-request cost at all.
+
+Profiling is sampling, not tracing: a daemon thread wakes every
+``profiling_interval_seconds`` while at least one profiled request is in
+flight, reads the event-loop thread's stack via ``sys._current_frames()`` and
+counts it against every profile that is active. Nothing runs inside the
+profiled code. The loop interleaves requests, so a profile can contain
+samples from requests that ran concurrently with it; samples taken while the
+loop is waiting for I/O (the stack ends at the frame driving the event loop,
+asyncio's or uvloop's) are collapsed into a single ``(idle)`` frame. The
+sampler thread needs the GIL, so during CPU-bound stretches the effective
+interval is at least ``sys.getswitchinterval()`` (5 ms by default).
+
+Each profile is written to ``profiling_dir`` as a pair of files sharing a
+name: ``.collapsed`` holds folded stacks (``a;b;c 12`` per line), which
+flamegraph.pl, speedscope and most flamegraph viewers import directly, and
+``.json`` holds request metadata plus the timing of every SQL statement the
+request executed. The directory is a ring: once it holds more than
+``profiling_max_profiles`` profiles the oldest are deleted. The profile name
+is returned in the ``X-Profile-Id`` response header.
+"""
+
+import asyncio
+import contextvars
+import hmac
+import inspect
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Longest SQL text kept per statement in the sidecar.
+MAX_STATEMENT_CHARS = 500
+
+_current: "contextvars.ContextVar[Optional[RequestProfile]]" = contextvars.ContextVar(
+    "request_profile", default=None
+)
+
+
+class RequestProfile:
+    """Stack samples and SQL timings collected for one request."""
+
+    def __init__(self, method: str, path: str):
+        self.id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.samples: Counter = Counter()
+        self.sql: List[Dict] = []
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+        self.status = 500
+
+    def collapsed(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+    def metadata(self, interval: float) -> Dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            "sample_interval_ms": interval * 1000,
+            "samples": sum(self.samples.values()),
+            "sql_total_ms": sum(statement["duration_ms"] for statement in self.sql),
+            "sql": self.sql,
+        }
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+_ASYNC_FLAGS = inspect.CO_COROUTINE | inspect.CO_ITERABLE_COROUTINE | inspect.CO_ASYNC_GENERATOR
+
+
+def _loop_code(frame):
+    """Code of the frame that drives the event loop beneath the running task.
+
+    Called from inside a task: below its coroutine frames sits either
+    asyncio's ``Handle._run`` (whose caller, ``_run_once``, is the loop) or,
+    with uvloop, whatever Python frame called the C ``run_until_complete``.
+    When the sampled stack tops out at that frame, the loop is idle.
+    """
+    while frame is not None and not frame.f_code.co_flags & _ASYNC_FLAGS:
+        frame = frame.f_back
+    while frame is not None and frame.f_code.co_flags & _ASYNC_FLAGS:
+        frame = frame.f_back
+    if frame is not None and frame.f_code.co_name == "_run" and frame.f_code.co_filename.endswith("events.py"):
+        frame = frame.f_back
+    return frame.f_code if frame is not None else None
+
+
+def _stack(frame, loop_code=None) -> Tuple[str, ...]:
+    code = frame.f_code
+    if code is loop_code or (code.co_name == "select" and code.co_filename.endswith("selectors.py")):
+        return ("(idle)",)
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels)
+
+
+class StackSampler:
+    """Samples one thread's stack on a background thread while profiles are active."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._target: Optional[int] = None
+        self._loop_code = None
+        self._active: Set[RequestProfile] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: RequestProfile) -> None:
+        loop_code = _loop_code(sys._getframe(1))
+        with self._lock:
+            self._target = threading.get_ident()
+            self._loop_code = loop_code
+            self._active.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def remove(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.discard(profile)
+            if not self._active:
+                self._wake.clear()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            stack = _stack(frame, self._loop_code)
+            del frame
+            with self._lock:
+                for profile in self._active:
+                    profile.samples[stack] += 1
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profile_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    if profile is None:
+        return
+    started = conn.info["profile_query_started"].pop()
+    profile.sql.append(
+        {
+            "statement": statement[:MAX_STATEMENT_CHARS],
+            "duration_ms": (time.perf_counter() - started) * 1000,
+            "executemany": executemany,
+        }
+    )
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    # so later statements pair with their own.
+    if _current.get() is not None and context.connection is not None:
+        started = context.connection.info.get("profile_query_started")
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine) -> None:
+    """Record SQL statement timings for profiled requests on ``engine``."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class ProfileRing:
+    """Directory holding at most ``max_profiles`` profiles, oldest dropped first."""
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def write(self, profile: RequestProfile, interval: float) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        route = re.sub(r"[^A-Za-z0-9]+", "_", profile.path).strip("_")[:60] or "root"
+        base = os.path.join(self.directory, f"{profile.id}-{profile.method}-{route}")
+        with open(base + ".collapsed", "w") as handle:
+            handle.write(profile.collapsed())
+        with open(base + ".json", "w") as handle:
+            json.dump(profile.metadata(interval), handle, indent=2)
+        self._trim()
+
+    def _trim(self) -> None:
+        names = sorted(name[: -len(".json")] for name in os.listdir(self.directory) if name.endswith(".json"))
+        for name in names[: max(0, len(names) - self.max_profiles)]:
+            for suffix in (".json", ".collapsed"):
+                try:
+                    os.remove(os.path.join(self.directory, name + suffix))
+                except FileNotFoundError:
+                    pass
+
+
+class ProfilingMiddleware:
+    """Profiles sampled or explicitly requested HTTP requests."""
+
+    def __init__(
+        self,
+        app,
+        sample_rate: float,
+        header: str,
+        token: Optional[str],
+        sampler: StackSampler,
+        ring: ProfileRing,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.header = header.lower().encode()
+        self.token = token.encode() if token else None
+        self.sampler = sampler
+        self.ring = ring
+
+    def _wanted(self, scope) -> bool:
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == self.header:
+                    return hmac.compare_digest(value, self.token)
+        return random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (PROFILE_ID_HEADER, profile.id.encode())],
+                }
+            await send(message)
+
+        token = _current.set(profile)
+        self.sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            self.sampler.remove(profile)
+            _current.reset(token)
+            profile.duration_ms = (time.perf_counter() - profile.started) * 1000
+            try:
+                await asyncio.to_thread(self.ring.write, profile, self.sampler.interval)
+            except OSError:
+                logger.exception("Failed to write request profile %s", profile.id)
+
+
+def install_profiling(app, engine) -> None:
+    """Add the profiling middleware and SQL listeners if enabled in settings."""
+    settings = get_settings()
+    if not settings.profiling_enabled:
+        return
+    directory = settings.profiling_dir or os.path.join(tempfile.gettempdir(), "mockloop-profiles")
+    instrument_engine(engine)
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=settings.profiling_sample_rate,
+        header=settings.profiling_header,
+        token=settings.profiling_token,
+        sampler=StackSampler(settings.profiling_interval_seconds),
+        ring=ProfileRing(directory, settings.profiling_max_profiles),
+    )
+    logger.info("Request profiling enabled; profiles are written to %s", directory)
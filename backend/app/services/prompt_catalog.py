@@ -0,0 +1,150 @@
+"""Question bank for mock interviews.
+
+Prompts are loaded once from a JSON data file, validated once, and indexed by
+slot (coding, discussion, behavioral). Selecting prompts for an interview
+profile (company, level, focus, difficulty) picks the most specific entry for
+each slot and memoizes the result: repeated lookups are a dict hit returning
+shared, already-validated models plus a pre-serialized JSON fragment, so no
+prompt objects are built per request.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import orjson
+from pydantic import BaseModel, Field
+
+from ..config import get_settings
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent.parent / "data" / "prompts.json"
+
+# One prompt per slot, in interview order.
+SLOTS = ("coding", "discussion", "behavioral")
+
+
+class InterviewPrompt(BaseModel):
+    """A single interviewer instruction."""
+
+    id: str
+    type: str = Field(..., description="coding|behavioral|followup")
+    title: str
+    body: str
+    expected_duration: int = Field(5, description="Minutes suggested for prompt")
+
+
+class CatalogEntry(InterviewPrompt):
+    """A prompt template plus the profiles it applies to; empty tag lists match anything."""
+
+    focus: List[str] = Field(default_factory=list)
+    levels: List[str] = Field(default_factory=list)
+    difficulty: List[str] = Field(default_factory=list)
+    companies: List[str] = Field(default_factory=list)
+
+    def specificity(self, company: str, level: str, focus: str, difficulty: str) -> Optional[int]:
+        """How closely the entry fits a profile, or None if it does not apply."""
+        score = 0
+        for values, wanted, weight in (
+            (self.companies, company, 8),
+            (self.levels, level, 4),
+            (self.difficulty, difficulty, 2),
+            (self.focus, focus, 1),
+        ):
+            if not values:
+                continue
+            if wanted not in values:
+                return None
+            score += weight
+        return score
+
+
+@dataclass(frozen=True)
+class PromptSet:
+    """Prompts selected for one interview profile, in model and serialized form."""
+
+    prompts: Tuple[InterviewPrompt, ...]
+    json: bytes
+
+
+def normalize_level(level: str) -> str:
+    """Reduce free-form levels like "Mid-level" or "Senior" to a catalog tag."""
+    match = re.match(r"[a-z]+", level.strip().lower())
+    return match.group(0) if match else ""
+
+
+def focus_for_role(role: Optional[str]) -> str:
+    """Map a job title like "Backend Engineer" to a catalog focus area."""
+    role = (role or "").lower()
+    if "front" in role or "ui" in role.split():
+        return "frontend"
+    if any(word in role for word in ("system", "infra", "platform", "sre", "reliability")):
+        return "systems"
+    return "backend"
+
+
+def splice_json(document: dict, key: str, fragment: bytes) -> bytes:
+    """Serialize ``document`` with ``fragment`` inserted verbatim under ``key``."""
+    head = orjson.dumps(document)[:-1]
+    separator = b"," if len(head) > 1 else b""
+    return head + separator + orjson.dumps(key) + b":" + fragment + b"}"
+
+
+class PromptCatalog:
+    """Indexed, memoized prompt selection over a validated question bank."""
+
+    def __init__(self, entries: Sequence[CatalogEntry], cache_size: int = 1024):
+        self._by_slot: Dict[str, List[CatalogEntry]] = {
+            slot: [entry for entry in entries if entry.type == slot] for slot in SLOTS
+        }
+        self._select = lru_cache(maxsize=cache_size)(self._build)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._by_slot.values())
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_CATALOG_PATH) -> "PromptCatalog":
+        """Read and validate a catalog file; raises on malformed entries."""
+        data = orjson.loads(Path(path).read_bytes())
+        return cls([CatalogEntry.model_validate(entry) for entry in data["prompts"]])
+
+    def prompts_for(
+        self,
+        company: str,
+        level: str,
+        focus: str = "backend",
+        difficulty: str = "medium",
+    ) -> PromptSet:
+        """Prompts for a profile; identical profiles share one cached ``PromptSet``."""
+        return self._select(company.strip(), level.strip(), focus.lower(), difficulty.lower())
+
+    def _build(self, company: str, level: str, focus: str, difficulty: str) -> PromptSet:
+        profile = (company.lower(), normalize_level(level), focus, difficulty)
+        prompts = []
+        for slot in SLOTS:
+            best, best_score = None, -1
+            for entry in self._by_slot[slot]:
+                score = entry.specificity(*profile)
+                if score is not None and score > best_score:
+                    best, best_score = entry, score
+            if best is None:
+                continue
+            prompts.append(
+                InterviewPrompt(
+                    id=best.id,
+                    type=best.type,
+                    title=best.title.format(company=company, level=level.capitalize()),
+                    body=best.body,
+                    expected_duration=best.expected_duration,
+                )
+            )
+        payload = orjson.dumps([prompt.model_dump() for prompt in prompts])
+        return PromptSet(prompts=tuple(prompts), json=payload)
+
+
+@lru_cache
+def get_prompt_catalog() -> PromptCatalog:
+    """Return the process-wide catalog, loading it on first use."""
+    path = get_settings().prompt_catalog_path
+    return PromptCatalog.load(Path(path) if path else DEFAULT_CATALOG_PATH)
@@ -0,0 +1,547 @@
+"""Warm pool of Python sandbox workers for candidate code execution.
+
+Starting a fresh interpreter for every "Run" click costs tens of milliseconds
+before any user code executes. The pool keeps a handful of pre-spawned workers
+(see ``sandbox_worker.py``) waiting on a pipe and hands each request to an idle
+worker, which runs it in a child forked from its pre-imported interpreter.
+Workers are replaced after ``max_runs_per_worker`` executions, a timeout, a
+crash, or a run that left processes behind.
+
+Code reaches workers over their stdin pipe, never through a file. Each
+worker's working directory (and ``TMPDIR``) is a private scratch directory
+under a per-pool root, preferably on tmpfs (``/dev/shm``). Workers empty their
+scratch directory after every run, the parent removes it when the worker is
+recycled, and the whole root is removed when the pool closes, so nothing
+accumulates in the shared temp dir.
+
+Every run carries a resource limit profile (memory, CPU, file size, process
+count) chosen by interview difficulty; the worker applies it to that run
+only (rlimits, plus counting the run's processes) and reports breaches as
+structured error types. Workers start in their own session so a fork bomb is killed with the
+worker, and in an empty network namespace where the kernel permits it.
+cgroups are not used: API pods do not get a delegated cgroup subtree.
+
+All worker I/O goes through asyncio pipes, so a slow program only occupies its
+own worker and never the event loop. The idle-worker queue doubles as the
+admission semaphore: at most ``size`` runs execute at once, at most
+``max_queue`` more may wait for a worker, and anything beyond that is rejected
+with :class:`SandboxBusy` instead of piling up.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional, Set
+
+from ..config import get_settings
+from .metrics import BYTES_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
+
+RUNS = registry.counter(
+    "code_runner_runs_total", "Sandbox runs by mode and outcome", ["mode", "outcome"]
+)
+EXECUTION_SECONDS = registry.histogram(
+    "code_runner_execution_seconds", "Wall time spent inside candidate code", ["mode"]
+)
+OVERHEAD_SECONDS = registry.histogram(
+    "code_runner_overhead_seconds",
+    "Runner time outside candidate code (pipe I/O, serialization)",
+    ["mode"],
+)
+QUEUE_WAIT_SECONDS = registry.histogram(
+    "code_runner_queue_wait_seconds", "Time spent waiting for an idle worker", ["mode"]
+)
+CPU_SECONDS = registry.histogram(
+    "code_runner_cpu_seconds", "CPU time consumed by candidate code", ["cpu"]
+)
+PEAK_RSS_BYTES = registry.histogram(
+    "code_runner_peak_rss_bytes", "Worker resident set high-water mark", buckets=BYTES_BUCKETS
+)
+OUTPUT_BYTES = registry.histogram(
+    "code_runner_output_bytes", "Captured output size per run", ["stream"], BYTES_BUCKETS
+)
+QUEUE_DEPTH = registry.gauge("code_runner_queue_depth", "Runs waiting for an idle worker")
+IDLE_WORKERS = registry.gauge("code_runner_idle_workers", "Warm workers ready to take a run")
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+
+# RAM-backed on Linux; avoids disk I/O for anything candidate code writes.
+TMPFS_DIR = "/dev/shm"
+
+
+def default_scratch_root() -> str:
+    """Prefer tmpfs for sandbox scratch space, falling back to the temp dir."""
+    if os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK | os.X_OK):
+        return TMPFS_DIR
+    return tempfile.gettempdir()
+
+
+def _remove_tree(path: str) -> None:
+    def log_failure(function, failed_path, exc_info):
+        logger.warning("Could not remove sandbox scratch path %s", failed_path, exc_info=exc_info)
+
+    if os.path.exists(path):
+        shutil.rmtree(path, onerror=log_failure)
+
+
+class WorkerCrashed(RuntimeError):
+    """Raised when a worker exits or answers with garbage mid-request."""
+
+
+class SandboxBusy(RuntimeError):
+    """Raised when the run queue is full or a worker did not free up in time."""
+
+
+@dataclass
+class SandboxResult:
+    """Outcome of a single sandboxed execution."""
+
+    stdout: str
+    stderr: str
+    success: bool
+    timed_out: bool = False
+    truncated: bool = False
+    crashed: bool = False
+    error_type: Optional[str] = None
+    cases: List[dict] = field(default_factory=list)
+    # wall_ms, cpu_user_ms, cpu_system_ms, peak_rss_kb, stdout_bytes,
+    # stderr_bytes, queue_wait_ms and runner_overhead_ms; see _record_usage.
+    usage: dict = field(default_factory=dict)
+
+    @property
+    def reproducible(self) -> bool:
+        """Whether the outcome depends only on the code, not on runner health."""
+        return not (self.timed_out or self.crashed)
+
+
+class SandboxWorker:
+    """A single pre-spawned interpreter speaking the line-delimited protocol."""
+
+    def __init__(self, process: asyncio.subprocess.Process, scratch_dir: str):
+        self.process = process
+        self.scratch_dir = scratch_dir
+        self.runs = 0
+        self.network_isolated = False
+
+    @classmethod
+    async def spawn(
+        cls, stream_limit: int, scratch_root: str, isolate_network: bool = False
+    ) -> "SandboxWorker":
+        scratch_dir = tempfile.mkdtemp(prefix="worker-", dir=scratch_root)
+        # A minimal environment: candidate code must not see API secrets.
+        env = {
+            "PATH": os.environ.get("PATH", os.defpath),
+            "HOME": scratch_dir,
+            "TMPDIR": scratch_dir,
+            "LANG": "C.UTF-8",
+            # Stable str hashing keeps set/dict ordering, and so output, repeatable;
+            # the execution cache relies on that.
+            "PYTHONHASHSEED": "0",
+        }
+        args = ["--isolate-network"] if isolate_network else []
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                # Isolated mode minus -E, which would ignore PYTHONHASHSEED; the
+                # environment above is built from scratch anyway.
+                "-s",
+                "-P",
+                WORKER_SCRIPT,
+                *args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                cwd=scratch_dir,
+                env=env,
+                limit=stream_limit,
+                # Own process group, so killing the worker also kills its children.
+                start_new_session=True,
+            )
+        except Exception:
+            _remove_tree(scratch_dir)
+            raise
+        worker = cls(process, scratch_dir)
+        handshake = await process.stdout.readline()
+        if not handshake:
+            await worker.kill()
+            raise WorkerCrashed("Sandbox worker exited during startup")
+        worker.network_isolated = json.loads(handshake).get("network_isolated", False)
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def send(self, payload: dict) -> None:
+        self.runs += 1
+        self.process.stdin.write(json.dumps(payload).encode() + b"\n")
+        await self.process.stdin.drain()
+
+    async def receive(self, timeout: float) -> dict:
+        line = await asyncio.wait_for(self.process.stdout.readline(), timeout)
+        if not line:
+            raise WorkerCrashed("Sandbox worker exited while running code")
+        try:
+            return json.loads(line)
+        except ValueError as exc:
+            raise WorkerCrashed("Sandbox worker returned an invalid response") from exc
+
+    async def run(self, payload: dict, timeout: float) -> dict:
+        await self.send(payload)
+        return await self.receive(timeout)
+
+    async def kill(self) -> None:
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await self.process.wait()
+        _remove_tree(self.scratch_dir)
+
+
+def _timeout_result(timeout: float) -> SandboxResult:
+    return SandboxResult(
+        stdout="",
+        stderr=f"Code execution timed out after {timeout:g} seconds",
+        success=False,
+        timed_out=True,
+        error_type="timeout",
+    )
+
+
+def _crash_result(exc: WorkerCrashed) -> SandboxResult:
+    return SandboxResult(
+        stdout="", stderr=str(exc), success=False, crashed=True, error_type="worker_crashed"
+    )
+
+
+class SandboxStream:
+    """Output of one streaming run, yielded frame by frame.
+
+    Yields ``{"type": "output", "stream": ..., "data": ...}`` frames while the
+    program runs and finishes with a single ``{"type": "exit", ...}`` frame.
+    Nothing is buffered beyond the frame being forwarded.
+    """
+
+    def __init__(
+        self,
+        pool: "SandboxPool",
+        worker: SandboxWorker,
+        timeout: float,
+        started: float,
+        queue_wait: float,
+    ):
+        self._pool = pool
+        self._worker = worker
+        self._timeout = timeout
+        self._started = started
+        self._queue_wait = queue_wait
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[dict]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._timeout
+        healthy = False
+        try:
+            while True:
+                frame = await self._worker.receive(max(0.0, deadline - loop.time()))
+                if frame.get("type") == "output":
+                    yield frame
+                    continue
+                healthy = not frame.get("retire")
+                result = SandboxResult(
+                    stdout="",
+                    stderr="",
+                    success=frame["success"],
+                    truncated=frame.get("truncated", False),
+                    error_type=frame.get("error_type"),
+                    usage=frame.get("usage", {}),
+                )
+                break
+        except asyncio.TimeoutError:
+            result = _timeout_result(self._timeout)
+        except WorkerCrashed as exc:
+            result = _crash_result(exc)
+        finally:
+            finished = time.perf_counter()
+            await self.aclose(healthy)
+
+        self._pool._record_usage(
+            "stream", result, self._queue_wait, finished - self._started
+        )
+        yield {
+            "type": "exit",
+            "success": result.success,
+            "error": result.stderr,
+            "error_type": result.error_type,
+            "truncated": result.truncated,
+            "usage": result.usage,
+        }
+
+    async def aclose(self, healthy: bool = False) -> None:
+        """Hand the worker back; an unfinished run gets its worker recycled."""
+        if not self._released:
+            self._released = True
+            await self._pool._release(self._worker, healthy)
+
+
+class SandboxPool:
+    """Fixed-size pool of warm sandbox workers."""
+
+    def __init__(
+        self,
+        size: int,
+        max_runs_per_worker: int,
+        timeout: float,
+        max_output_bytes: int,
+        max_queue: int = 0,
+        queue_timeout: float = 5.0,
+        scratch_root: Optional[str] = None,
+        isolate_network: bool = False,
+    ):
+        self.size = size
+        self.max_runs_per_worker = max_runs_per_worker
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.scratch_root = scratch_root or default_scratch_root()
+        self.isolate_network = isolate_network
+        self.waiting = 0
+        self._scratch_dir: Optional[str] = None
+        self._warned_network = False
+        # JSON escaping can inflate captured output several times over.
+        self._stream_limit = 8 * max_output_bytes + 64 * 1024
+        self._idle: "asyncio.Queue[SandboxWorker]" = asyncio.Queue()
+        self._started = False
+        self._closed = False
+        self._start_lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Spawn the initial set of workers."""
+        async with self._start_lock:
+            if self._started:
+                return
+            self._scratch_dir = tempfile.mkdtemp(prefix="mockloop-sandbox-", dir=self.scratch_root)
+            workers = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+            for worker in workers:
+                self._idle.put_nowait(worker)
+            self._started = True
+            logger.info("Sandbox pool started with %d workers", self.size)
+
+    async def close(self) -> None:
+        """Terminate all idle workers; busy workers are killed on release."""
+        self._closed = True
+        # Respawns in flight see the pool closed and kill what they started.
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        while not self._idle.empty():
+            await self._idle.get_nowait().kill()
+        if self._scratch_dir is not None:
+            # Reclaims scratch space of workers still busy at shutdown too.
+            _remove_tree(self._scratch_dir)
+        logger.info("Sandbox pool closed")
+
+    async def execute(self, code: str, limits: Optional[dict] = None) -> SandboxResult:
+        """Run ``code`` on a warm worker and return its captured output."""
+        payload = {"mode": "script", "code": code, "limits": limits}
+        return await self._submit(payload, self.timeout)
+
+    async def run_tests(
+        self,
+        code: str,
+        cases: List[dict],
+        case_timeout: float,
+        limits: Optional[dict] = None,
+    ) -> SandboxResult:
+        """Load ``code`` once and evaluate each ``{"input", "expected"}`` case.
+
+        Every case gets its own ``case_timeout``; the run as a whole may take
+        the normal execution timeout plus the sum of the case budgets.
+        """
+        payload = {
+            "mode": "batch",
+            "code": code,
+            "cases": cases,
+            "case_timeout": case_timeout,
+            "limits": limits,
+        }
+        return await self._submit(payload, self.timeout + case_timeout * len(cases))
+
+    async def stream(self, code: str, limits: Optional[dict] = None) -> "SandboxStream":
+        """Start ``code`` on a worker and return an iterator over its output frames.
+
+        Admission happens here, so :class:`SandboxBusy` is raised before any
+        frame is produced. The returned stream must be iterated to completion
+        or closed with :meth:`SandboxStream.aclose`.
+        """
+        if not self._started:
+            await self.start()
+
+        submitted = time.perf_counter()
+        worker = await self._acquire()
+        acquired = time.perf_counter()
+        payload = {
+            "mode": "script",
+            "stream": True,
+            "code": code,
+            "max_output": self.max_output_bytes,
+            "limits": limits,
+        }
+        try:
+            await worker.send(payload)
+        except Exception:
+            await self._release(worker, healthy=False)
+            raise
+        return SandboxStream(self, worker, self.timeout, acquired, acquired - submitted)
+
+    async def _submit(self, payload: dict, timeout: float) -> SandboxResult:
+        if not self._started:
+            await self.start()
+
+        mode = payload["mode"]
+        submitted = time.perf_counter()
+        worker = await self._acquire()
+        acquired = time.perf_counter()
+        payload["max_output"] = self.max_output_bytes
+        healthy = False
+        try:
+            response = await worker.run(payload, timeout)
+            # The worker asks to be retired when a run left processes behind.
+            healthy = not response.get("retire")
+            result = SandboxResult(
+                stdout=response["stdout"],
+                stderr=response["stderr"],
+                success=response["success"],
+                truncated=response.get("truncated", False),
+                error_type=response.get("error_type"),
+                cases=response.get("cases", []),
+                usage=response.get("usage", {}),
+            )
+        except asyncio.TimeoutError:
+            result = _timeout_result(timeout)
+        except WorkerCrashed as exc:
+            result = _crash_result(exc)
+        finally:
+            finished = time.perf_counter()
+            await self._release(worker, healthy)
+
+        self._record_usage(mode, result, acquired - submitted, finished - acquired)
+        return result
+
+    @staticmethod
+    def _record_usage(
+        mode: str, result: SandboxResult, queue_wait: float, round_trip: float
+    ) -> None:
+        """Fill in parent-side timings and feed the runner histograms."""
+        usage = result.usage
+        usage.setdefault("wall_ms", round_trip * 1000)
+        usage["queue_wait_ms"] = queue_wait * 1000
+        usage["runner_overhead_ms"] = max(0.0, round_trip * 1000 - usage["wall_ms"])
+
+        outcome = result.error_type or ("success" if result.success else "error")
+        RUNS.inc(mode, outcome)
+        EXECUTION_SECONDS.observe(usage["wall_ms"] / 1000, mode)
+        OVERHEAD_SECONDS.observe(usage["runner_overhead_ms"] / 1000, mode)
+        QUEUE_WAIT_SECONDS.observe(queue_wait, mode)
+        if "cpu_user_ms" in usage:
+            CPU_SECONDS.observe(usage["cpu_user_ms"] / 1000, "user")
+            CPU_SECONDS.observe(usage["cpu_system_ms"] / 1000, "system")
+            PEAK_RSS_BYTES.observe(usage["peak_rss_kb"] * 1024)
+            OUTPUT_BYTES.observe(usage["stdout_bytes"], "stdout")
+            OUTPUT_BYTES.observe(usage["stderr_bytes"], "stderr")
+
+    async def _acquire(self) -> SandboxWorker:
+        # Don't let newcomers overtake runs that are already waiting.
+        if not self.waiting and not self._idle.empty():
+            return self._idle.get_nowait()
+        if self.waiting >= self.max_queue:
+            raise SandboxBusy("Code runner is at capacity, please retry shortly")
+        self.waiting += 1
+        try:
+            return await asyncio.wait_for(self._idle.get(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise SandboxBusy("Timed out waiting for a free code runner") from None
+        finally:
+            self.waiting -= 1
+
+    async def _release(self, worker: SandboxWorker, healthy: bool) -> None:
+        if self._closed:
+            await worker.kill()
+            return
+        if healthy and worker.alive and worker.runs < self.max_runs_per_worker:
+            self._idle.put_nowait(worker)
+            return
+        await worker.kill()
+        self._schedule_replace()
+
+    def _schedule_replace(self) -> None:
+        task = asyncio.create_task(self._replace())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _spawn(self) -> SandboxWorker:
+        worker = await SandboxWorker.spawn(
+            self._stream_limit, self._scratch_dir, self.isolate_network
+        )
+        if self.isolate_network and not worker.network_isolated and not self._warned_network:
+            self._warned_network = True
+            logger.warning("Network namespaces unavailable; sandbox workers keep network access")
+        return worker
+
+    async def _replace(self) -> None:
+        try:
+            worker = await self._spawn()
+        except Exception:
+            logger.exception("Failed to respawn sandbox worker")
+            # Keep the pool at full strength; try again shortly.
+            await asyncio.sleep(1)
+            if not self._closed:
+                self._schedule_replace()
+            return
+        if self._closed:
+            await worker.kill()
+        else:
+            self._idle.put_nowait(worker)
+
+
+_pool: Optional[SandboxPool] = None
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """Return the process-wide sandbox pool built from settings."""
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        _pool = SandboxPool(
+            size=settings.sandbox_pool_size,
+            max_runs_per_worker=settings.sandbox_max_runs_per_worker,
+            timeout=settings.sandbox_timeout_seconds,
+            max_output_bytes=settings.sandbox_max_output_bytes,
+            max_queue=settings.sandbox_max_queue,
+            queue_timeout=settings.sandbox_queue_timeout_seconds,
+            scratch_root=settings.sandbox_scratch_dir,
+            isolate_network=settings.sandbox_isolate_network,
+        )
+        pool = _pool
+        QUEUE_DEPTH.set_function(lambda: pool.waiting)
+        IDLE_WORKERS.set_function(pool._idle.qsize)
+    return _pool
+
+
+def get_limit_profile(difficulty: Optional[str] = None) -> dict:
+    """Resource limits for a run at ``difficulty``, falling back to the default profile."""
+    settings = get_settings()
+    profiles = settings.sandbox_limit_profiles
+    profile = profiles.get((difficulty or "").lower()) or profiles.get(
+        settings.sandbox_default_limit_profile
+    )
+    return profile.model_dump() if profile is not None else {}
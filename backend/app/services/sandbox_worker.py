@@ -0,0 +1,655 @@
+"""Long-lived Python worker used by the code execution sandbox pool.
+
+This file is executed directly by ``sys.executable`` and must only depend on
+the standard library. The parent process sends one JSON request per line on
+stdin and receives one JSON response per line on stdout. Every request runs in
+a child forked from this pre-imported process, so nothing a run does to
+``builtins``, ``sys.modules``, signal handlers or threads can reach the next
+run. The worker is a child subreaper: processes the run left behind are
+re-parented to it, and if any survive the run the response asks the pool to
+retire the worker. The pool also recycles workers after a configurable number
+of runs.
+
+Requests either run a whole script (``mode: "script"``) or load the code once
+and evaluate a list of test cases against it, each with its own timeout and
+captured output (``mode: "batch"``). Script runs with ``stream: true`` forward
+output as ``{"type": "output"}`` frames while the program runs, ahead of the
+final response line, and stop the program once ``max_output`` bytes were sent.
+
+Each request may carry ``limits``: memory, CPU and file size are applied with
+``setrlimit`` inside the run, and the process count is enforced by the worker,
+which counts the run's descendants while it waits and retires itself, so the
+pool kills its process group, once there are too many (``RLIMIT_NPROC`` would
+count every process of the uid, not of the run). A run that trips a limit reports a structured ``error_type`` such as
+``memory_limit_exceeded``. When started with ``--isolate-network`` the worker
+moves itself into an empty network namespace before accepting work.
+"""
+
+import builtins
+import contextlib
+import errno
+import io
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import sys
+import time
+import traceback
+
+# Modules candidates reach for most often. Importing them once here means the
+# first ``import collections`` inside a run is a dictionary lookup.
+import bisect  # noqa: F401
+import collections  # noqa: F401
+import dataclasses  # noqa: F401
+import functools  # noqa: F401
+import heapq  # noqa: F401
+import itertools  # noqa: F401
+import math  # noqa: F401
+import re  # noqa: F401
+import string  # noqa: F401
+import typing  # noqa: F401
+
+# How often a running request's process count is checked.
+PROCESS_POLL_SECONDS = 0.02
+
+
+class CappedBuffer(io.StringIO):
+    """Text buffer that silently drops everything past ``limit`` characters."""
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+        self.size = 0
+        self.truncated = False
+
+    def write(self, text: str) -> int:
+        remaining = self.limit - self.size
+        if remaining <= 0:
+            self.truncated = True
+            return len(text)
+        if len(text) > remaining:
+            self.truncated = True
+            super().write(text[:remaining])
+            self.size = self.limit
+        else:
+            super().write(text)
+            self.size += len(text)
+        return len(text)
+
+
+class OutputLimitExceeded(BaseException):
+    """Raised from a streaming write once the run's byte budget is spent."""
+
+
+class FrameSink:
+    """Forwards streamed output to the parent in coalesced frames."""
+
+    # Flush at least this often (in bytes) even without a newline.
+    FRAME_BYTES = 4096
+
+    def __init__(self, proto_out, limit: int):
+        self.proto_out = proto_out
+        self.limit = limit
+        self.sent = {"stdout": 0, "stderr": 0}
+        self._pending = []
+        self._pending_bytes = 0
+
+    def emit(self, stream: str, text: str) -> None:
+        size = len(text.encode("utf-8", "replace"))
+        if self.sent["stdout"] + self.sent["stderr"] + size > self.limit:
+            self.flush()
+            raise OutputLimitExceeded()
+        self.sent[stream] += size
+        if self._pending and self._pending[-1][0] == stream:
+            self._pending[-1][1].append(text)
+        else:
+            self._pending.append((stream, [text]))
+        self._pending_bytes += size
+        if "\n" in text or self._pending_bytes >= self.FRAME_BYTES:
+            self.flush()
+
+    def flush(self) -> None:
+        for stream, parts in self._pending:
+            frame = {"type": "output", "stream": stream, "data": "".join(parts)}
+            self.proto_out.write(json.dumps(frame).encode() + b"\n")
+        if self._pending:
+            self.proto_out.flush()
+        self._pending = []
+        self._pending_bytes = 0
+
+
+class StreamingWriter(io.TextIOBase):
+    """File-like object that hands every write to a :class:`FrameSink`."""
+
+    def __init__(self, sink: FrameSink, stream: str):
+        self.sink = sink
+        self.stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.sink.emit(self.stream, text)
+        return len(text)
+
+    def flush(self) -> None:
+        self.sink.flush()
+
+
+class CpuLimitExceeded(BaseException):
+    """Raised from the SIGXCPU handler once a run spent its CPU budget."""
+
+
+def _raise_cpu_limit(signum, frame):
+    raise CpuLimitExceeded("CPU time limit exceeded")
+
+
+class CaseTimeout(BaseException):
+    """Raised inside a test case that overran its time budget.
+
+    Derives from ``BaseException`` so a bare ``except Exception`` in candidate
+    code cannot swallow it.
+    """
+
+
+def _raise_case_timeout(signum, frame):
+    raise CaseTimeout()
+
+
+def _detach_standard_streams():
+    """Move the protocol pipes off fds 0-2 so user code cannot corrupt them."""
+    proto_in = os.fdopen(os.dup(0), "rb")
+    proto_out = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    return proto_in, proto_out
+
+
+def _print_user_traceback(exc: BaseException, stream) -> None:
+    """Print a traceback without the worker's own frames."""
+    tb = exc.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename == __file__:
+        tb = tb.tb_next
+    traceback.print_exception(type(exc), exc, tb, file=stream)
+
+
+@contextlib.contextmanager
+def _captured(stdout, stderr):
+    """Point the interpreter's standard streams at per-run buffers."""
+    cwd = os.getcwd()
+    sys.stdin = io.StringIO("")
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        yield
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = sys.__stdin__, sys.__stdout__, sys.__stderr__
+        os.chdir(cwd)
+
+
+def _new_namespace() -> dict:
+    return {"__name__": "__main__", "__builtins__": builtins}
+
+
+def _limit_error(exc: BaseException):
+    """Map an exception to the sandbox limit it signals, if any."""
+    if isinstance(exc, MemoryError):
+        return "memory_limit_exceeded"
+    if isinstance(exc, CpuLimitExceeded):
+        return "cpu_limit_exceeded"
+    if isinstance(exc, OSError) and exc.errno == errno.EFBIG:
+        return "file_size_limit_exceeded"
+    # fork() fails with EAGAIN once the system runs out of pids or threads, which
+    # Python raises as BlockingIOError.
+    if isinstance(exc, BlockingIOError) or (
+        isinstance(exc, RuntimeError) and "can't start new thread" in str(exc)
+    ):
+        return "process_limit_exceeded"
+    return None
+
+
+def _exec_solution(code: str, namespace: dict, stderr) -> tuple:
+    """Execute the candidate's source.
+
+    Returns ``(success, error_type)`` where ``error_type`` names the sandbox
+    limit the program tripped, if any.
+    """
+    try:
+        exec(compile(code, "<solution>", "exec"), namespace)
+    except SystemExit as exc:
+        return exc.code in (None, 0), None
+    except OutputLimitExceeded:
+        raise
+    except BaseException as exc:  # noqa: BLE001 - report everything to the user
+        _print_user_traceback(exc, stderr)
+        return False, _limit_error(exc)
+    return True, None
+
+
+def run_code(code: str, max_output: int) -> dict:
+    """Execute ``code`` in a fresh namespace and capture its output."""
+    stdout = CappedBuffer(max_output)
+    stderr = CappedBuffer(max_output)
+
+    with _captured(stdout, stderr):
+        success, error_type = _exec_solution(code, _new_namespace(), stderr)
+
+    return {
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "success": success,
+        "truncated": stdout.truncated or stderr.truncated,
+        "error_type": error_type,
+    }
+
+
+def run_streaming(code: str, max_output: int, proto_out) -> dict:
+    """Execute ``code`` while forwarding its output to the parent as it is written."""
+    sink = FrameSink(proto_out, max_output)
+    stdout = StreamingWriter(sink, "stdout")
+    stderr = StreamingWriter(sink, "stderr")
+    truncated = False
+
+    with _captured(stdout, stderr):
+        try:
+            success, error_type = _exec_solution(code, _new_namespace(), stderr)
+        except OutputLimitExceeded:
+            success, error_type, truncated = False, "output_limit_exceeded", True
+    try:
+        sink.flush()
+    except OutputLimitExceeded:
+        pass
+
+    return {
+        "stdout": "",
+        "stderr": "",
+        "success": success,
+        "truncated": truncated,
+        "error_type": error_type,
+        "output_bytes": sink.sent,
+    }
+
+
+def _run_case(case: dict, namespace: dict, timeout: float, max_output: int) -> dict:
+    """Evaluate one test case against a copy of the loaded solution namespace."""
+    source = case["input"].strip()
+    expected_source = case.get("expected")
+    output = CappedBuffer(max_output)
+    result = {
+        "input": case["input"],
+        "passed": False,
+        "output": "",
+        "result": None,
+        "expected": None,
+        "error": "",
+        "elapsed_ms": 0.0,
+        "timed_out": False,
+        "error_type": None,
+    }
+
+    try:
+        code = compile(source, "<test>", "eval")
+        is_expression = True
+    except SyntaxError:
+        try:
+            code = compile(source, "<test>", "exec")
+            is_expression = False
+        except SyntaxError as exc:
+            result["error"] = f"SyntaxError: {exc.msg}"
+            return result
+
+    # Shallow copy so names bound by one case don't leak into the next.
+    scope = dict(namespace)
+    started = time.perf_counter()
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with _captured(output, output):
+            value = eval(code, scope)
+            if expected_source is not None:
+                expected = eval(expected_source, scope)
+                result["expected"] = repr(expected)
+                passed = value == expected
+            else:
+                passed = True
+        result["passed"] = bool(passed)
+        if is_expression:
+            result["result"] = repr(value)
+    except CaseTimeout:
+        result["timed_out"] = True
+        result["error"] = f"Timed out after {timeout:g} seconds"
+    except BaseException as exc:  # noqa: BLE001 - report everything to the user
+        result["error"] = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        result["error_type"] = _limit_error(exc)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+    result["output"] = output.getvalue()
+    return result
+
+
+def run_batch(code: str, cases: list, case_timeout: float, max_output: int) -> dict:
+    """Load ``code`` once, then evaluate every case in isolation."""
+    stdout = CappedBuffer(max_output)
+    stderr = CappedBuffer(max_output)
+    namespace = _new_namespace()
+
+    with _captured(stdout, stderr):
+        loaded, error_type = _exec_solution(code, namespace, stderr)
+
+    results = []
+    if loaded:
+        per_case_output = max(1024, max_output // max(1, len(cases)))
+        results = [_run_case(case, namespace, case_timeout, per_case_output) for case in cases]
+
+    return {
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "success": loaded,
+        "truncated": stdout.truncated or stderr.truncated,
+        "error_type": error_type,
+        "cases": results,
+    }
+
+
+def _clear_scratch(path: str) -> None:
+    """Remove whatever the last run left in the worker's scratch directory."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def _address_space_bytes() -> int:
+    """Current virtual memory size of this process."""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[0]) * resource.getpagesize()
+
+
+@contextlib.contextmanager
+def _limited(limits):
+    """Apply per-run soft rlimits and restore the previous ones afterwards.
+
+    Memory and CPU are budgets on top of what the process already uses; the
+    forked run inherits the worker's address space.
+    """
+    if not limits:
+        yield
+        return
+
+    wanted = {}
+    if limits.get("memory_mb"):
+        wanted[resource.RLIMIT_AS] = _address_space_bytes() + limits["memory_mb"] * 1024 * 1024
+    if limits.get("cpu_seconds"):
+        used = sum(_cpu_times())
+        wanted[resource.RLIMIT_CPU] = int(used) + 1 + int(limits["cpu_seconds"])
+    if limits.get("max_file_mb"):
+        wanted[resource.RLIMIT_FSIZE] = limits["max_file_mb"] * 1024 * 1024
+
+    previous = {}
+    for limit, soft in wanted.items():
+        current_soft, hard = resource.getrlimit(limit)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        try:
+            resource.setrlimit(limit, (soft, hard))
+        except (ValueError, OSError):
+            continue
+        previous[limit] = (current_soft, hard)
+    try:
+        yield
+    finally:
+        for limit, values in previous.items():
+            resource.setrlimit(limit, values)
+
+
+def _isolate_network() -> bool:
+    """Move into a fresh network namespace with no interfaces configured."""
+    clone_newuser, clone_newnet = 0x10000000, 0x40000000
+    uid, gid = os.getuid(), os.getgid()
+    # Unprivileged processes need a user namespace to own the new netns.
+    flags = clone_newnet if uid == 0 else clone_newnet | clone_newuser
+    try:
+        if hasattr(os, "unshare"):
+            os.unshare(flags)
+        else:
+            import ctypes
+
+            libc = ctypes.CDLL(None, use_errno=True)
+            if libc.unshare(flags) != 0:
+                return False
+    except (OSError, AttributeError):
+        return False
+
+    if flags & clone_newuser:
+        # Map our own ids so the scratch directory stays writable.
+        try:
+            with open("/proc/self/setgroups", "w") as setgroups:
+                setgroups.write("deny")
+            with open("/proc/self/uid_map", "w") as uid_map:
+                uid_map.write(f"{uid} {uid} 1")
+            with open("/proc/self/gid_map", "w") as gid_map:
+                gid_map.write(f"{gid} {gid} 1")
+        except OSError:
+            pass
+    return True
+
+
+def _cpu_times() -> tuple:
+    """User/system CPU seconds of this process plus any children it reaped."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + children.ru_utime, own.ru_stime + children.ru_stime
+
+
+def _become_subreaper() -> bool:
+    """Adopt orphaned descendants so leftovers of a run stay visible."""
+    pr_set_child_subreaper = 36
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.prctl(pr_set_child_subreaper, 1, 0, 0, 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def _children(pid: int) -> list:
+    """Pids of the live children of ``pid``, forked from any of its threads."""
+    children = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return children
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as listing:
+                children.extend(int(child) for child in listing.read().split())
+        except OSError:
+            pass
+    return children
+
+
+def _descendants(pid: int, limit: int = 0) -> list:
+    """Every live process below ``pid``, including orphans it adopted.
+
+    With ``limit`` set the walk stops as soon as more than ``limit`` were found.
+    """
+    found = []
+    pending = _children(pid)
+    while pending:
+        child = pending.pop()
+        found.append(child)
+        if limit and len(found) > limit:
+            break
+        pending.extend(_children(child))
+    return found
+
+
+def _reap_strays() -> bool:
+    """Reap exited children; return True if any are still running."""
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return False
+        if pid == 0:
+            return True
+
+
+def _kill_strays() -> None:
+    """Kill whatever the last run left running, including re-parented grandchildren."""
+    for _ in range(10):
+        strays = _descendants(os.getpid())
+        if not strays:
+            break
+        for pid in strays:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGKILL)
+        for pid in strays:
+            with contextlib.suppress(ChildProcessError):
+                os.waitpid(pid, os.WNOHANG)
+
+
+def _collect(pid: int, read_fd: int, max_processes: int) -> tuple:
+    """Read the run's response pipe until it closes or the run exits.
+
+    Returns ``(data, status, rusage)``. A descendant of the run can keep the
+    pipe open after the run itself exits, so EOF alone is not waited for.
+    While waiting, the run's processes are counted every poll; once there are
+    more than ``max_processes`` this gives up on the run and returns
+    ``(None, None, None)`` without reaping it.
+    """
+    chunks = []
+    waited = 0
+    while not waited:
+        ready, _, _ = select.select([read_fd], [], [], PROCESS_POLL_SECONDS)
+        if max_processes and len(_descendants(os.getpid(), max_processes)) > max_processes:
+            os.close(read_fd)
+            return None, None, None
+        if ready:
+            chunk = os.read(read_fd, 65536)
+            if chunk:
+                chunks.append(chunk)
+                continue
+            waited, status, rusage = os.wait4(pid, 0)
+            break
+        waited, status, rusage = os.wait4(pid, os.WNOHANG)
+    os.set_blocking(read_fd, False)
+    with contextlib.suppress(BlockingIOError):
+        while True:
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    os.close(read_fd)
+    return b"".join(chunks), status, rusage
+
+
+def _abnormal_exit(status: int) -> dict:
+    if os.WIFSIGNALED(status):
+        message = f"Process killed by signal {os.WTERMSIG(status)}"
+    else:
+        message = f"Process exited with status {os.waitstatus_to_exitcode(status)}"
+    return {"stdout": "", "stderr": message, "success": False, "truncated": False, "error_type": None}
+
+
+def run_isolated(request: dict, proto_out) -> dict:
+    """Handle ``request`` in a forked child and return its response.
+
+    Usage is measured here from the child's ``wait4`` accounting, so CPU time
+    and peak RSS belong to this run alone (plus any processes it reaped).
+    """
+    started = time.perf_counter()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_fd)
+            response = handle(request, proto_out)
+            with os.fdopen(write_fd, "wb") as pipe:
+                pipe.write(json.dumps(response).encode())
+            status = 0
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    max_processes = (request.get("limits") or {}).get("max_processes", 0)
+    data, status, rusage = _collect(pid, read_fd, max_processes)
+    wall = time.perf_counter() - started
+    if data is None:
+        # Killing a fork bomb one pid at a time loses the race; retiring makes
+        # the pool SIGKILL the worker's whole process group at once.
+        return {
+            "stdout": "",
+            "stderr": f"Process limit exceeded: more than {max_processes} processes",
+            "success": False,
+            "truncated": False,
+            "error_type": "process_limit_exceeded",
+            "usage": {"wall_ms": wall * 1000},
+            "retire": True,
+        }
+    response = json.loads(data) if data else _abnormal_exit(status)
+    output_bytes = response.pop("output_bytes", None) or {
+        "stdout": len(response["stdout"].encode("utf-8", "replace")),
+        "stderr": len(response["stderr"].encode("utf-8", "replace")),
+    }
+    response["usage"] = {
+        "wall_ms": wall * 1000,
+        "cpu_user_ms": rusage.ru_utime * 1000,
+        "cpu_system_ms": rusage.ru_stime * 1000,
+        # Kilobytes on Linux.
+        "peak_rss_kb": rusage.ru_maxrss,
+        "stdout_bytes": output_bytes["stdout"],
+        "stderr_bytes": output_bytes["stderr"],
+    }
+    if _reap_strays():
+        _kill_strays()
+        response["retire"] = True
+    return response
+
+
+def handle(request: dict, proto_out) -> dict:
+    max_output = request.get("max_output", 1_000_000)
+    with _limited(request.get("limits")):
+        if request.get("mode") == "batch":
+            return run_batch(
+                request["code"], request["cases"], request.get("case_timeout", 2.0), max_output
+            )
+        if request.get("stream"):
+            return run_streaming(request["code"], max_output, proto_out)
+        return run_code(request["code"], max_output)
+
+
+def main() -> None:
+    network_isolated = "--isolate-network" in sys.argv and _isolate_network()
+    _become_subreaper()
+    proto_in, proto_out = _detach_standard_streams()
+    signal.signal(signal.SIGALRM, _raise_case_timeout)
+    signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+    # Oversized writes fail with EFBIG instead of killing the worker.
+    signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+    scratch_dir = os.getcwd()
+    handshake = {"ready": True, "network_isolated": network_isolated}
+    proto_out.write(json.dumps(handshake).encode() + b"\n")
+    proto_out.flush()
+
+    for line in proto_in:
+        response = run_isolated(json.loads(line), proto_out)
+        proto_out.write(json.dumps(response).encode() + b"\n")
+        proto_out.flush()
+        _clear_scratch(scratch_dir)
+
+
+if __name__ == "__main__":
+    main()
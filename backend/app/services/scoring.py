@@ -0,0 +1,67 @@
+"""Incremental scoring state for interview transcripts.
+
+Feedback used to be computed by re-walking the whole transcript at the end of
+an interview. ``ScoreAccumulator`` instead folds each event into running
+aggregates as it arrives (event counts by type, analysis snippets, code-run
+pass rates), so finalizing feedback only reads a few counters no
+matter how long the session ran. The state is a small JSON document that can
+be kept next to the session in any session store.
+"""
+
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+# Only the first few analysis snippets are kept; feedback quotes the first.
+MAX_ANALYSIS_SNIPPETS = 3
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass
+class ScoreAccumulator:
+    """Running aggregates over the events of one interview."""
+
+    touches: int = 0
+    event_counts: Dict[str, int] = field(default_factory=dict)
+    analysis: List[str] = field(default_factory=list)
+    code_runs: int = 0
+    tests_passed: int = 0
+    tests_total: int = 0
+
+    def add(self, event_type: str, payload: Mapping[str, Any]) -> None:
+        """Fold one event into the aggregates in O(1)."""
+        self.touches += 1
+        self.event_counts[event_type] = self.event_counts.get(event_type, 0) + 1
+
+        snippet = payload.get("analysis")
+        if snippet and len(self.analysis) < MAX_ANALYSIS_SNIPPETS:
+            self.analysis.append(str(snippet))
+
+        if event_type == "run_code":
+            self.code_runs += 1
+            self.tests_passed += _as_int(payload.get("passed"))
+            self.tests_total += _as_int(payload.get("total"))
+
+    def extend(self, events: Iterable[Any]) -> "ScoreAccumulator":
+        """Fold transcript events (objects with ``event_type`` and ``payload``)."""
+        for event in events:
+            self.add(event.event_type, event.payload)
+        return self
+
+    @property
+    def pass_rate(self) -> Optional[float]:
+        return self.tests_passed / self.tests_total if self.tests_total else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Mapping[str, Any]]) -> "ScoreAccumulator":
+        # Ignore keys written by older versions still held in session stores.
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (data or {}).items() if k in known})
@@ -0,0 +1,41 @@
+"""Public interview session identifiers and how they map to rows."""
+
+import secrets
+import string
+from typing import Optional
+
+from ..database import Interview
+
+
+def generate_session_id() -> str:
+    """Generate a semantic session ID like 'isession-abc123def'."""
+    # Generate 9 random characters (mix of letters and numbers)
+    chars = string.ascii_lowercase + string.digits
+    random_suffix = ''.join(secrets.choice(chars) for _ in range(9))
+    return f"isession-{random_suffix}"
+
+
+# Rows created before the session_id column existed are addressed by their
+# primary key behind this prefix, which can never collide with "isession-".
+LEGACY_SESSION_PREFIX = "ilegacy-"
+
+
+def db_id_to_session_id(db_id: int) -> str:
+    """Deterministic public ID for legacy rows without a stored session_id."""
+    return f"{LEGACY_SESSION_PREFIX}{db_id}"
+
+
+def legacy_session_db_id(session_id: str) -> Optional[int]:
+    """Return the primary key encoded in a legacy session ID, if it is one."""
+    if not session_id.startswith(LEGACY_SESSION_PREFIX):
+        return None
+    suffix = session_id[len(LEGACY_SESSION_PREFIX):]
+    return int(suffix) if suffix.isdigit() else None
+
+
+def session_filter(session_id: str):
+    """WHERE clause addressing a session by its indexed public or legacy ID."""
+    legacy_id = legacy_session_db_id(session_id)
+    if legacy_id is not None:
+        return Interview.id == legacy_id
+    return Interview.session_id == session_id
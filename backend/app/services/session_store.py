@@ -0,0 +1,131 @@
+"""Storage for the lightweight sessions created by the interviews router.
+
+Sessions are short-lived and cheap to recreate, so they only need to outlive
+the interview itself. Two interchangeable backends are provided:
+
+* ``MemorySessionStore`` keeps sessions in this process, bounded by entry
+  count (least recently used go first) and by a TTL.
+* ``RedisSessionStore`` keeps them in Redis with the same TTL, so any
+  uvicorn worker or replica can finish a session another one started.
+
+Values are opaque strings (serialized JSON) so the store does not depend on
+the router's models. ``update`` applies a function to a stored value
+atomically, so concurrent writers never lose each other's changes.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from ..config import get_settings
+
+
+class MemorySessionStore:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def update(self, key: str, change: Callable[[str], str]) -> Optional[str]:
+        """Replace the value with ``change(value)``; ``None`` if the key is missing.
+
+        ``get`` and ``set`` never suspend, so although they are awaited the
+        read, ``change`` and the write run without yielding to the event loop;
+        on the single-threaded loop no other coroutine can interleave with them.
+        """
+        current = await self.get(key)
+        if current is None:
+            return None
+        updated = change(current)
+        await self.set(key, updated)
+        return updated
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class RedisSessionStore:
+    """Sessions shared by every worker through Redis, expired by Redis."""
+
+    def __init__(self, redis_url: str, ttl_seconds: int, prefix: str = "interview:session:"):
+        import redis.asyncio as redis
+
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._redis = redis.from_url(redis_url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._redis.get(self.prefix + key)
+
+    async def set(self, key: str, value: str) -> None:
+        await self._redis.set(self.prefix + key, value, ex=self.ttl_seconds)
+
+    async def update(self, key: str, change: Callable[[str], str]) -> Optional[str]:
+        """Replace the value with ``change(value)`` under WATCH/MULTI, retrying on conflict."""
+        from redis.exceptions import WatchError
+
+        name = self.prefix + key
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(name)
+                    current = await pipe.get(name)
+                    if current is None:
+                        await pipe.unwatch()
+                        return None
+                    updated = change(current)
+                    pipe.multi()
+                    pipe.set(name, updated, ex=self.ttl_seconds)
+                    await pipe.execute()
+                    return updated
+                except WatchError:
+                    continue
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self.prefix + key)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+_store = None
+
+
+def get_session_store():
+    """Return the process-wide interview session store built from settings."""
+    global _store
+    if _store is None:
+        settings = get_settings()
+        if settings.interview_session_backend == "redis":
+            _store = RedisSessionStore(settings.redis_url, settings.interview_session_ttl_seconds)
+        else:
+            _store = MemorySessionStore(
+                settings.interview_session_max_entries,
+                settings.interview_session_ttl_seconds,
+            )
+    return _store
@@ -0,0 +1,226 @@
+"""Delta-compressed history of a session's code.
+
+Every saved edit becomes a revision in ``code_snapshots``. Most revisions
+store only a zlib-compressed line diff against the previous one; every
+``code_snapshot_keyframe_interval`` revisions (or whenever a diff would not
+be smaller) the full text is stored instead. Reading any revision means
+decompressing one keyframe and at most ``interval - 1`` diffs, all fetched
+with one range scan over ``(interview_id, revision)``. Saves that did not
+change the code are not recorded at all.
+
+A delta is a list of operations against the previous revision's lines:
+``[start, end]`` copies those lines, a string inserts text.
+"""
+
+import difflib
+import json
+import zlib
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..database import CodeSnapshot
+
+DeltaOp = Union[List[int], str]
+
+# Latest (revision, code) per interview, so a save usually diffs against
+# memory instead of rebuilding the previous revision from the database. Only
+# committed revisions go in: a revision written by a transaction waits in its
+# session's ``info`` until the commit.
+_LATEST_CACHE_SIZE = 1024
+_latest: "OrderedDict[int, Tuple[int, str]]" = OrderedDict()
+_PENDING_KEY = "snapshots_latest"
+
+
+def encode_delta(old: str, new: str) -> List[DeltaOp]:
+    """Line-level diff turning ``old`` into ``new``."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops: List[DeltaOp] = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            ops.append("".join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old: str, ops: List[DeltaOp]) -> str:
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        parts.append(op if isinstance(op, str) else "".join(old_lines[op[0]:op[1]]))
+    return "".join(parts)
+
+
+def _compress(data: str) -> bytes:
+    return zlib.compress(data.encode(), get_settings().code_snapshot_compression_level)
+
+
+def _decompress(payload: bytes) -> str:
+    return zlib.decompress(payload).decode()
+
+
+def _remember(interview_id: int, revision: int, code: str) -> None:
+    _latest[interview_id] = (revision, code)
+    _latest.move_to_end(interview_id)
+    while len(_latest) > _LATEST_CACHE_SIZE:
+        _latest.popitem(last=False)
+
+
+def _pending(db: AsyncSession) -> Dict[int, Tuple[int, str]]:
+    return db.info.setdefault(_PENDING_KEY, {})
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for interview_id, (revision, code) in session.info.pop(_PENDING_KEY, {}).items():
+        _remember(interview_id, revision, code)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+async def _rows_for(db: AsyncSession, interview_id: int, revision: int):
+    """The keyframe at or before ``revision`` and every delta up to it, in order."""
+    keyframe = (
+        select(func.max(CodeSnapshot.revision))
+        .where(
+            CodeSnapshot.interview_id == interview_id,
+            CodeSnapshot.is_keyframe.is_(True),
+            CodeSnapshot.revision <= revision,
+        )
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(CodeSnapshot.revision, CodeSnapshot.is_keyframe, CodeSnapshot.payload, CodeSnapshot.created_at)
+        .where(
+            CodeSnapshot.interview_id == interview_id,
+            CodeSnapshot.revision >= keyframe,
+            CodeSnapshot.revision <= revision,
+        )
+        .order_by(CodeSnapshot.revision)
+    )
+    return result.all()
+
+
+def _replay_rows(rows, code: str = "") -> str:
+    for row in rows:
+        data = _decompress(row.payload)
+        code = data if row.is_keyframe else apply_delta(code, json.loads(data))
+    return code
+
+
+async def load_revision(db: AsyncSession, interview_id: int, revision: int) -> Optional[Dict]:
+    """Reconstruct one revision; None if it does not exist."""
+    rows = await _rows_for(db, interview_id, revision)
+    if not rows or rows[-1].revision != revision:
+        return None
+    return {
+        "revision": revision,
+        "code": _replay_rows(rows),
+        "created_at": rows[-1].created_at,
+    }
+
+
+async def latest_revision(db: AsyncSession, interview_id: int) -> Optional[Tuple[int, str]]:
+    """The newest ``(revision, code)`` for a session, or None without history."""
+    result = await db.execute(
+        select(func.max(CodeSnapshot.revision)).where(CodeSnapshot.interview_id == interview_id)
+    )
+    revision = result.scalar()
+    if revision is None:
+        return None
+    cached = _pending(db).get(interview_id) or _latest.get(interview_id)
+    if cached is not None and cached[0] == revision:
+        return cached
+    code = _replay_rows(await _rows_for(db, interview_id, revision))
+    # Nothing this transaction wrote is in the history, so all of it is committed.
+    _remember(interview_id, revision, code)
+    return revision, code
+
+
+async def record_snapshot(db: AsyncSession, interview_id: int, code: str) -> Optional[int]:
+    """Append ``code`` as a new revision; returns it, or None if nothing changed."""
+    latest = await latest_revision(db, interview_id)
+    if latest is not None and latest[1] == code:
+        return None
+
+    settings = get_settings()
+    revision = 0 if latest is None else latest[0] + 1
+    payload = _compress(code)
+    is_keyframe = True
+    if latest is not None and revision % settings.code_snapshot_keyframe_interval:
+        delta = _compress(json.dumps(encode_delta(latest[1], code), separators=(",", ":")))
+        if len(delta) < len(payload):
+            payload, is_keyframe = delta, False
+
+    db.add(
+        CodeSnapshot(
+            interview_id=interview_id,
+            revision=revision,
+            is_keyframe=is_keyframe,
+            payload=payload,
+            code_size=len(code),
+        )
+    )
+    await db.flush()
+    _pending(db)[interview_id] = (revision, code)
+    return revision
+
+
+async def list_snapshots(db: AsyncSession, interview_id: int) -> List[Dict]:
+    """Revision metadata without payloads."""
+    result = await db.execute(
+        select(
+            CodeSnapshot.revision,
+            CodeSnapshot.is_keyframe,
+            CodeSnapshot.code_size,
+            func.length(CodeSnapshot.payload).label("stored_bytes"),
+            CodeSnapshot.created_at,
+        )
+        .where(CodeSnapshot.interview_id == interview_id)
+        .order_by(CodeSnapshot.revision)
+    )
+    return [dict(row._mapping) for row in result.all()]
+
+
+async def replay(
+    db: AsyncSession, interview_id: int, since: int = 0, batch_size: int = 200
+) -> AsyncIterator[Dict]:
+    """Yield every revision from ``since`` onwards with its full code, oldest first."""
+    first = await _rows_for(db, interview_id, since)
+    if not first or first[-1].revision != since:
+        return
+    code = _replay_rows(first)
+    yield {"revision": since, "code": code, "created_at": first[-1].created_at}
+
+    after = since
+    while True:
+        result = await db.execute(
+            select(CodeSnapshot.revision, CodeSnapshot.is_keyframe, CodeSnapshot.payload, CodeSnapshot.created_at)
+            .where(CodeSnapshot.interview_id == interview_id, CodeSnapshot.revision > after)
+            .order_by(CodeSnapshot.revision)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        for row in rows:
+            code = _replay_rows([row], code)
+            yield {"revision": row.revision, "code": code, "created_at": row.created_at}
+        if len(rows) < batch_size:
+            return
+        after = rows[-1].revision
+
+
+async def delete_snapshots(db: AsyncSession, interview_id: int) -> None:
+    """Remove a session's code history along with the session."""
+    _latest.pop(interview_id, None)
+    _pending(db).pop(interview_id, None)
+    await db.execute(delete(CodeSnapshot).where(CodeSnapshot.interview_id == interview_id))
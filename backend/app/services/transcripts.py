@@ -0,0 +1,89 @@
+"""Append-only transcript storage in ``interview_messages``.
+
+Each transcript event becomes one row; the row id doubles as the event's
+sequence number, so "everything after N" is a single range scan over the
+``(interview_id, id)`` index and replaying a session never rewrites a blob.
+Batches are written with one multi-row ``INSERT ... VALUES`` statement.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import InterviewMessage
+
+# Payload keys promoted to their own columns; everything else is kept in
+# message_metadata next to the event type.
+_COLUMN_KEYS = ("role", "content")
+
+
+def _naive_utc(value: Optional[datetime]) -> datetime:
+    """Clients send ISO timestamps, often with a ``Z`` offset; the column is naive UTC."""
+    if value is None:
+        return datetime.utcnow()
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _to_row(interview_id: int, event: Dict[str, Any]) -> Dict[str, Any]:
+    payload = dict(event.get("payload") or {})
+    role = str(payload.pop("role", "user"))[:50]
+    content = str(payload.pop("content", ""))
+    return {
+        "interview_id": interview_id,
+        "role": role,
+        "content": content,
+        "message_metadata": {"event_type": event["event_type"], **payload},
+        "timestamp": _naive_utc(event.get("timestamp")),
+    }
+
+
+def _to_event(row) -> Dict[str, Any]:
+    metadata = dict(row.message_metadata or {})
+    event_type = metadata.pop("event_type", "message")
+    return {
+        "sequence": row.id,
+        "event_type": event_type,
+        "payload": {"role": row.role, "content": row.content, **metadata},
+        "timestamp": row.timestamp,
+    }
+
+
+async def append_events(
+    db: AsyncSession, interview_id: int, events: Sequence[Dict[str, Any]]
+) -> Optional[int]:
+    """Insert events in one batched statement; return the last sequence written."""
+    if not events:
+        return None
+    result = await db.execute(
+        insert(InterviewMessage).returning(InterviewMessage.id),
+        [_to_row(interview_id, event) for event in events],
+    )
+    return max(result.scalars().all())
+
+
+async def events_since(
+    db: AsyncSession, interview_id: int, after: int = 0, limit: int = 500
+) -> List[Dict[str, Any]]:
+    """Events with a sequence greater than ``after``, oldest first."""
+    result = await db.execute(
+        select(
+            InterviewMessage.id,
+            InterviewMessage.role,
+            InterviewMessage.content,
+            InterviewMessage.message_metadata,
+            InterviewMessage.timestamp,
+        )
+        .where(InterviewMessage.interview_id == interview_id, InterviewMessage.id > after)
+        .order_by(InterviewMessage.id)
+        .limit(limit)
+    )
+    return [_to_event(row) for row in result.all()]
+
+
+async def delete_events(db: AsyncSession, interview_id: int) -> None:
+    """Remove a session's transcript along with the session."""
+    await db.execute(delete(InterviewMessage).where(InterviewMessage.interview_id == interview_id))
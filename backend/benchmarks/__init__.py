@@ -0,0 +1 @@
+"""Micro-benchmarks and load scenarios for the API hot paths; run with ``python -m benchmarks``."""
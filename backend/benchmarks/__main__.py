@@ -0,0 +1,74 @@
+"""Run the benchmark suite and write a JSON report.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks                          # micro + load, JSON to stdout
+    python -m benchmarks --suite micro -o base.json
+    python -m benchmarks -o head.json --compare base.json
+
+The load suite uses a fresh SQLite file unless ``--database-url`` (or the
+``DATABASE_URL_OVERRIDE`` environment variable) points it at Postgres. With
+``--compare``, benchmarks whose p50 grew by more than ``--threshold`` are
+reported and the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n")[0])
+    parser.add_argument("--suite", choices=("micro", "load", "all"), default="all")
+    parser.add_argument("-o", "--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed p50 slowdown (0.10 = 10%%)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for micro-benchmark iterations")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users for the load suite")
+    parser.add_argument("--rounds", type=int, default=5, help="Interviews each virtual user plays")
+    parser.add_argument("--saves", type=int, default=10, help="Progress saves per interview")
+    parser.add_argument("--database-url", help="Async SQLAlchemy URL for the load suite")
+    args = parser.parse_args(argv)
+
+    # Settings and the engine are built on first import of the app, so the
+    # database must be chosen before anything from ``app`` is imported.
+    database_url = args.database_url or os.environ.get("DATABASE_URL_OVERRIDE")
+    if not database_url:
+        scratch = tempfile.mkdtemp(prefix="mockloop-bench-")
+        database_url = f"sqlite+aiosqlite:///{os.path.join(scratch, 'bench.db')}"
+    os.environ["DATABASE_URL_OVERRIDE"] = database_url
+
+    from . import harness
+
+    results = []
+    if args.suite in ("micro", "all"):
+        from . import micro
+
+        results.extend(micro.run(args.scale))
+    if args.suite in ("load", "all"):
+        from . import load
+
+        results.extend(load.run(args.users, args.rounds, args.saves))
+
+    document = harness.report(
+        results,
+        suite=args.suite,
+        database=database_url.split("://", 1)[0],
+        load={"users": args.users, "rounds": args.rounds, "saves": args.saves},
+    )
+    harness.write_json(document, args.output)
+
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        lines = harness.compare(document, baseline, args.threshold)
+        print("\n".join(lines), file=sys.stderr)
+        if any(line.endswith("REGRESSION") for line in lines):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
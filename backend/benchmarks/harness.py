@@ -0,0 +1,126 @@
+"""Timing, summary statistics and JSON reports shared by every benchmark."""
+
+import json
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class BenchmarkResult:
+    """Latency distribution and throughput of one benchmark."""
+
+    name: str
+    kind: str  # micro or load
+    iterations: int
+    throughput_per_s: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(name: str, kind: str, samples: List[float], wall_seconds: float) -> BenchmarkResult:
+    """Build a result from per-operation durations in seconds."""
+    ordered = sorted(samples)
+    ms = 1000.0
+    return BenchmarkResult(
+        name=name,
+        kind=kind,
+        iterations=len(ordered),
+        throughput_per_s=len(ordered) / wall_seconds if wall_seconds else 0.0,
+        mean_ms=sum(ordered) / len(ordered) * ms if ordered else 0.0,
+        p50_ms=percentile(ordered, 0.50) * ms,
+        p95_ms=percentile(ordered, 0.95) * ms,
+        p99_ms=percentile(ordered, 0.99) * ms,
+        max_ms=ordered[-1] * ms if ordered else 0.0,
+    )
+
+
+def run_micro(
+    name: str, function: Callable[[], object], iterations: int, batch: int = 1, warmup: int = 100
+) -> BenchmarkResult:
+    """Time ``function`` synchronously.
+
+    Calls are timed ``batch`` at a time and each sample is the batch average,
+    so functions that take well under a microsecond are not dominated by
+    clock overhead.
+    """
+    for _ in range(warmup):
+        function()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(max(1, iterations // batch)):
+        batch_started = time.perf_counter()
+        for _ in range(batch):
+            function()
+        samples.append((time.perf_counter() - batch_started) / batch)
+    wall = time.perf_counter() - started
+    result = summarize(name, "micro", samples, wall)
+    result.iterations = len(samples) * batch
+    result.throughput_per_s = result.iterations / wall
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results: List[BenchmarkResult], **meta) -> Dict:
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            **meta,
+        },
+        "results": [asdict(result) for result in results],
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Lines describing each shared benchmark; entries slower by more than ``threshold`` are flagged."""
+    previous = {result["name"]: result for result in baseline["results"]}
+    lines = []
+    for result in current["results"]:
+        before = previous.get(result["name"])
+        if before is None or not before["p50_ms"]:
+            continue
+        change = result["p50_ms"] / before["p50_ms"] - 1
+        flag = "REGRESSION" if change > threshold else ""
+        lines.append(
+            f"{result['name']:<40} p50 {before['p50_ms']:.4f} -> {result['p50_ms']:.4f} ms "
+            f"({change:+.1%}) {flag}".rstrip()
+        )
+    return lines
+
+
+def write_json(document: Dict, path: Optional[str]) -> None:
+    text = json.dumps(document, indent=2)
+    if path:
+        with open(path, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,90 @@
+"""End-to-end load scenario against the ASGI app, in process.
+
+Each virtual user repeatedly plays one interview: create a session, save
+progress ``saves`` times, run code once on the sandbox pool, then end the
+session and wait for its feedback job. Requests go through the full
+middleware stack and the real application lifespan (sandbox workers,
+autosave buffer, job workers) via ``httpx.ASGITransport``, so no server or
+network is involved. The database is whatever ``database_url`` points at;
+``python -m benchmarks`` defaults it to a throwaway SQLite file.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+from .harness import BenchmarkResult, summarize
+
+STEPS = ("create", "save", "run_code", "end")
+
+
+async def _interview(client: httpx.AsyncClient, user: int, round_: int, saves: int, timings) -> None:
+    async def timed(step: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        timings[step].append(time.perf_counter() - started)
+        response.raise_for_status()
+        return response
+
+    created = await timed("create", "POST", "/api/sessions/create", json={})
+    session_id = created.json()["session_id"]
+
+    code = f"def solve(nums):\n    return sorted(nums)  # user {user} round {round_}\n"
+    for elapsed in range(saves):
+        code += f"# edit {elapsed}\n"
+        await timed(
+            "save",
+            "POST",
+            f"/api/sessions/{session_id}/save",
+            json={"code": code, "timeElapsed": elapsed},
+        )
+
+    await timed(
+        "run_code",
+        "POST",
+        "/api/code/execute",
+        json={"code": code, "test_cases": ["solve([3, 1, 2])"]},
+    )
+
+    # Ending includes waiting for the feedback job, as a client would.
+    started = time.perf_counter()
+    ended = await client.post(f"/api/sessions/{session_id}/end")
+    ended.raise_for_status()
+    polled = await client.get(ended.json()["status_url"], params={"wait": 30})
+    polled.raise_for_status()
+    status = polled.json()
+    timings["end"].append(time.perf_counter() - started)
+    if status["status"] != "succeeded":
+        raise RuntimeError(f"feedback job ended as {status['status']}: {status['error']}")
+
+
+async def run_async(users: int, rounds: int, saves: int) -> List[BenchmarkResult]:
+    from app.main import create_app
+
+    app = create_app()
+    timings: Dict[str, List[float]] = defaultdict(list)
+    scenarios: List[float] = []
+
+    async def user(index: int) -> None:
+        for round_ in range(rounds):
+            started = time.perf_counter()
+            await _interview(client, index, round_, saves, timings)
+            scenarios.append(time.perf_counter() - started)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(user(index) for index in range(users)))
+            wall = time.perf_counter() - started
+
+    results = [summarize("load:interview", "load", scenarios, wall)]
+    results.extend(summarize(f"load:{step}", "load", timings[step], wall) for step in STEPS)
+    return results
+
+
+def run(users: int = 10, rounds: int = 5, saves: int = 10) -> List[BenchmarkResult]:
+    return asyncio.run(run_async(users, rounds, saves))
@@ -0,0 +1,68 @@
+"""Micro-benchmarks for small functions on the API hot paths."""
+
+from datetime import datetime
+from typing import List
+from uuid import uuid4
+
+from app.routers.code_execution import build_script
+from app.routers.interviews import InterviewRequest, InterviewSession, TranscriptEvent
+from app.services.mock_ai import MockInterviewEngine
+from app.services.session_ids import generate_session_id
+
+from .harness import BenchmarkResult, run_micro
+
+SOLUTION = '''
+def two_sum(nums, target):
+    seen = {}
+    for index, value in enumerate(nums):
+        if target - value in seen:
+            return [seen[target - value], index]
+        seen[value] = index
+    return []
+'''
+TEST_CASES = [f"two_sum([{i}, {i + 1}, {i + 2}, 7], {i + 7})" for i in range(20)] + [
+    "# a comment",
+    "assert two_sum([2, 7], 9) == [0, 1]",
+]
+
+
+def _transcript(events: int) -> List[TranscriptEvent]:
+    kinds = ("code_update", "chat", "run_code")
+    return [
+        TranscriptEvent(
+            event_type=kinds[i % len(kinds)],
+            payload={"passed": "3", "total": "4"} if i % 3 == 2 else {"analysis": "O(n) with a hash map"},
+        )
+        for i in range(events)
+    ]
+
+
+def run(scale: float = 1.0) -> List[BenchmarkResult]:
+    engine = MockInterviewEngine()
+    request = InterviewRequest(candidate_name="Bench", target_company="Acme", experience_level="Senior")
+    session = InterviewSession(
+        session_id=uuid4(),
+        started_at=datetime.utcnow(),
+        request=request,
+        prompts=engine.generate_prompts(request),
+    )
+    transcript = _transcript(200)
+
+    def n(iterations: int) -> int:
+        return max(1, int(iterations * scale))
+
+    return [
+        run_micro("generate_session_id", generate_session_id, n(100_000), batch=100),
+        run_micro(
+            "generate_feedback[200 events]",
+            lambda: engine.generate_feedback(session, transcript),
+            n(2_000),
+            batch=10,
+        ),
+        run_micro(
+            "build_script[22 test cases]",
+            lambda: build_script(SOLUTION, TEST_CASES),
+            n(20_000),
+            batch=10,
+        ),
+    ]
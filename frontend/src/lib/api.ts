@@ -32,6 +32,16 @@ export interface InterviewSession {
 export interface TranscriptEvent {
   event_type: string;
   payload: Record<string, string>;
+  timestamp?: string;
+}
+
+export interface StoredTranscriptEvent extends TranscriptEvent {
+  sequence: number;
+}
+
+export interface TranscriptPage {
+  events: StoredTranscriptEvent[];
+  next_since: number;
 }
 
 export interface InterviewFeedback {
@@ -73,11 +83,55 @@ export async function startInterview(
   });
 }
 
+export interface JobAccepted {
+  job_id: string;
+  kind: string;
+  status: string;
+  status_url: string;
+}
+
+export interface JobStatus<T> {
+  job_id: string;
+  kind: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  attempts: number;
+  result: T | null;
+  error: string | null;
+}
+
+export async function getJob<T>(
+  jobId: string,
+  waitSeconds = 0
+): Promise<JobStatus<T>> {
+  const params = waitSeconds > 0 ? `?wait=${waitSeconds}` : "";
+  return http<JobStatus<T>>(`${API_BASE_URL}/api/jobs/${jobId}${params}`, {
+    credentials: "include",
+  });
+}
+
+// Long-polls a background job until it finishes; each request is held by the
+// server for up to `waitSeconds`, so this costs one request per wait window.
+export async function waitForJob<T>(
+  jobId: string,
+  timeoutMs = 120_000,
+  waitSeconds = 20
+): Promise<T> {
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    const job = await getJob<T>(jobId, waitSeconds);
+    if (job.status === "succeeded") return job.result as T;
+    if (job.status === "failed") {
+      throw new Error(job.error || "Background job failed");
+    }
+  }
+  throw new Error("Timed out waiting for background job");
+}
+
 export async function endInterview(
   sessionId: string,
   transcript: TranscriptEvent[]
 ): Promise<InterviewFeedback> {
-  return http<InterviewFeedback>(
+  const job = await http<JobAccepted>(
     `${API_BASE_URL}/api/sessions/${sessionId}/end`,
     {
       method: "POST",
@@ -85,6 +139,7 @@ export async function endInterview(
       credentials: "include",
     }
   );
+  return waitForJob<InterviewFeedback>(job.job_id);
 }
 
 export async function getInterviewSession(
@@ -101,38 +156,56 @@ export async function getActiveInterviews(): Promise<InterviewSession[]> {
   });
 }
 
+export interface SessionPage {
+  sessions: InterviewSession[];
+  nextCursor: string | null;
+}
+
+async function fetchSessionPage(url: string): Promise<SessionPage> {
+  const response = await fetch(url, {
+    credentials: "include",
+    cache: "no-store",
+  });
+
+  if (!response.ok) {
+    const message = await response.text();
+    throw new Error(message || `Request failed: ${response.status}`);
+  }
+
+  return {
+    sessions: (await response.json()) as InterviewSession[],
+    nextCursor: response.headers.get("X-Next-Cursor"),
+  };
+}
+
 export async function getAllSessions(
   status?: string,
   limit: number = 50,
-  offset: number = 0
-): Promise<InterviewSession[]> {
+  cursor?: string
+): Promise<SessionPage> {
   const params = new URLSearchParams();
   if (status) params.append("status", status);
   params.append("limit", limit.toString());
-  params.append("offset", offset.toString());
+  if (cursor) params.append("cursor", cursor);
 
-  return http<InterviewSession[]>(
-    `${API_BASE_URL}/api/sessions/all?${params}`,
-    {
-      credentials: "include",
-    }
-  );
+  return fetchSessionPage(`${API_BASE_URL}/api/sessions/all?${params}`);
 }
 
 export async function getSessionHistory(
   limit: number = 20,
-  offset: number = 0
-): Promise<InterviewSession[]> {
+  cursor?: string
+): Promise<SessionPage> {
   const params = new URLSearchParams();
   params.append("limit", limit.toString());
-  params.append("offset", offset.toString());
+  if (cursor) params.append("cursor", cursor);
 
-  return http<InterviewSession[]>(
-    `${API_BASE_URL}/api/sessions/history?${params}`,
-    {
-      credentials: "include",
-    }
-  );
+  return fetchSessionPage(`${API_BASE_URL}/api/sessions/history?${params}`);
+}
+
+export interface SaveProgressResponse {
+  status: "saved" | "buffered";
+  version?: number;
+  sequence?: number;
 }
 
 export async function saveInterviewProgress(
@@ -142,14 +215,31 @@ export async function saveInterviewProgress(
     transcript?: TranscriptEvent[];
     timeElapsed?: number;
   }
-): Promise<void> {
-  return http<void>(`${API_BASE_URL}/api/sessions/${sessionId}/save`, {
+): Promise<SaveProgressResponse> {
+  return http<SaveProgressResponse>(`${API_BASE_URL}/api/sessions/${sessionId}/save`, {
     method: "POST",
     body: JSON.stringify(data),
     credentials: "include",
   });
 }
 
+export async function getTranscript(
+  sessionId: string,
+  since: number = 0,
+  limit: number = 500
+): Promise<TranscriptPage> {
+  const params = new URLSearchParams();
+  params.append("since", since.toString());
+  params.append("limit", limit.toString());
+
+  return http<TranscriptPage>(
+    `${API_BASE_URL}/api/sessions/${sessionId}/transcript?${params}`,
+    {
+      credentials: "include",
+    }
+  );
+}
+
 export interface CreateSessionRequest {
   level?: string;
   role?: string;
@@ -171,13 +261,16 @@ export interface CodeExecutionRequest {
   code: string;
   language?: string;
   test_cases?: string[];
+  difficulty?: string;
 }
 
 export interface CodeExecutionResponse {
   output: string;
   error?: string;
   success: boolean;
+  error_type?: string | null;
   execution_time_ms?: number;
+  cached?: boolean;
 }
 
 export async function executeCode(
@@ -193,6 +286,156 @@ export async function executeCode(
   });
 }
 
+export interface ExecutionExitEvent {
+  success: boolean;
+  error: string;
+  error_type: string | null;
+  truncated: boolean;
+  usage: Record<string, number>;
+}
+
+export async function executeCodeStream(
+  request: CodeExecutionRequest,
+  onOutput: (stream: "stdout" | "stderr", data: string) => void,
+  signal?: AbortSignal
+): Promise<ExecutionExitEvent> {
+  const response = await fetch(`${API_BASE_URL}/api/code/execute/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      ...request,
+      language: request.language || "python",
+    }),
+    credentials: "include",
+    cache: "no-store",
+    signal,
+  });
+
+  if (!response.ok || !response.body) {
+    const message = await response.text();
+    throw new Error(message || `Request failed: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      const event = rawEvent.match(/^event: (.*)$/m)?.[1];
+      const data = rawEvent.match(/^data: (.*)$/m)?.[1];
+      if (!event || data === undefined) continue;
+      if (event === "exit") return JSON.parse(data) as ExecutionExitEvent;
+      onOutput(event as "stdout" | "stderr", JSON.parse(data));
+    }
+  }
+  throw new Error("Execution stream ended without an exit event");
+}
+
+export interface InterviewerReplyDone {
+  first_token_ms: number | null;
+  total_ms: number;
+}
+
+export async function streamInterviewerReply(
+  sessionId: string,
+  message: string,
+  onToken: (token: string) => void,
+  signal?: AbortSignal
+): Promise<InterviewerReplyDone> {
+  const response = await fetch(
+    `${API_BASE_URL}/api/interviews/${sessionId}/reply`,
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ message }),
+      credentials: "include",
+      cache: "no-store",
+      signal,
+    }
+  );
+
+  if (!response.ok || !response.body) {
+    const text = await response.text();
+    throw new Error(text || `Request failed: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      const event = rawEvent.match(/^event: (.*)$/m)?.[1];
+      const data = rawEvent.match(/^data: (.*)$/m)?.[1];
+      if (!event || data === undefined) continue;
+      if (event === "done") return JSON.parse(data) as InterviewerReplyDone;
+      if (event === "error") throw new Error(JSON.parse(data).error);
+      onToken(JSON.parse(data));
+    }
+  }
+  throw new Error("Interviewer stream ended without a done event");
+}
+
+export interface TestCase {
+  input: string;
+  expected?: string;
+}
+
+export interface TestCaseResult {
+  input: string;
+  passed: boolean;
+  output: string;
+  result?: string | null;
+  expected?: string | null;
+  error: string;
+  elapsed_ms: number;
+  timed_out: boolean;
+}
+
+export interface BatchExecutionResponse {
+  success: boolean;
+  output: string;
+  error: string;
+  passed: number;
+  failed: number;
+  total: number;
+  cases: TestCaseResult[];
+  cached?: boolean;
+}
+
+export async function runTestCases(request: {
+  code: string;
+  language?: string;
+  test_cases: TestCase[];
+  case_timeout_ms?: number;
+}): Promise<BatchExecutionResponse> {
+  return http<BatchExecutionResponse>(`${API_BASE_URL}/api/code/test`, {
+    method: "POST",
+    body: JSON.stringify({
+      ...request,
+      language: request.language || "python",
+    }),
+    credentials: "include",
+  });
+}
+
 export async function deleteSession(
   sessionId: string
 ): Promise<{ status: string; session_id: string }> {
@@ -216,3 +459,46 @@ export async function discardSession(
     }
   );
 }
+
+export type LiveClientMessage =
+  | { type: "code"; code: string; seq?: number }
+  // start/end are JS string indices (UTF-16 code units) into the current code.
+  | { type: "code_diff"; start: number; end: number; text: string; seq?: number }
+  | { type: "time"; elapsed: number }
+  | { type: "chat"; message: string }
+  | {
+      type: "run";
+      id: string;
+      code?: string;
+      test_cases?: string[];
+      difficulty?: string;
+    }
+  | { type: "ping"; ts?: number };
+
+export type LiveServerMessage = { type: string; [key: string]: any };
+
+export function openLiveSession(
+  sessionId: string,
+  onMessage: (message: LiveServerMessage) => void
+): { send: (message: LiveClientMessage) => void; close: () => void } {
+  const url = `${API_BASE_URL.replace(/^http/, "ws")}/ws/sessions/${sessionId}`;
+  const socket = new WebSocket(url);
+
+  socket.onmessage = (event) => {
+    const message = JSON.parse(event.data) as LiveServerMessage;
+    if (message.type === "ping") {
+      socket.send(JSON.stringify({ type: "ping", ts: message.ts }));
+      return;
+    }
+    onMessage(message);
+  };
+
+  return {
+    send: (message) => {
+      if (socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify(message));
+      }
+    },
+    close: () => socket.close(),
+  };
+}